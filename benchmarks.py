@@ -0,0 +1,229 @@
+"""
+Benchmarks for timeparser.
+
+Run all benchmarks with:
+
+    python benchmarks.py
+
+or only some of them:
+
+    python benchmarks.py memory
+"""
+
+import sys
+import gc
+import time
+import types
+import timeparser
+
+try: import tracemalloc
+except ImportError: tracemalloc = None
+
+
+DATES = ['24.3.2013', '24 Apr 2013', '2013-04-24', '24032013', '24.03.', '24']
+DATETIMES = ['24.3.2013,23:44', '24-04-13_23:44:05', '24.3. 23:44', '20130424234405']
+
+
+def _deep_size(objects):
+    """
+    Bytes of objects and everything they contain; shared objects (like
+    interned format-strings) are counted once.
+    """
+    seen = set()
+    size = 0
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, types.ModuleType)): continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict): stack.extend(obj.items())
+        elif isinstance(obj, (list, tuple, set, frozenset)): stack.extend(obj)
+        if hasattr(obj, '__dict__'): stack.append(obj.__dict__)
+        for cls in type(obj).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            if isinstance(slots, str): slots = (slots,)
+            stack.extend(getattr(obj, slot) for slot in slots if hasattr(obj, slot))
+    return size
+
+
+def bench_memory(n=2000):
+    """
+    Memory held by n format-lists of each sample-string.
+    """
+    timeparser.ENDIAN.set('little')
+    samples = [(timeparser.DateFormats, s) for s in DATES]
+    samples += [(timeparser.DatetimeFormats, s) for s in DATETIMES]
+    # fill the format-tables first; they are shared by all lists
+    for cls, string in samples: cls(string)
+    cls(); gc.collect()
+
+    if tracemalloc:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        lists = [cls(string) for x in range(n) for cls, string in samples]
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    else:
+        # without tracemalloc (python2) the lists are measured recursively;
+        # the strings the lists share with the format-tables are not theirs
+        tables = _deep_size(getattr(timeparser, '_TABLES', dict()).values())
+        lists = [cls(string) for x in range(n) for cls, string in samples]
+        size = _deep_size(list(getattr(timeparser, '_TABLES', dict()).values()) + lists) - tables
+
+    print('memory: %d format-lists hold %d bytes (%.1f bytes per list)' % (
+        len(lists), size, float(size) / len(lists)))
+
+
+def _latencies(func, strings, repeat=1):
+    latencies = list()
+    for string in strings * repeat:
+        start = time.time()
+        try: func(string)
+        except ValueError: pass
+        latencies.append(time.time() - start)
+    latencies.sort()
+    return latencies
+
+
+def _report(name, latencies):
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+    print('%s: p50 %.2fms  p99 %.2fms  max %.2fms' % (
+        name, p(0.5) * 1000, p(0.99) * 1000, latencies[-1] * 1000))
+
+
+ADVERSARIAL = [
+    '1' * 200,
+    '1 ' * 100,
+    '1.1 ' * 50,
+    '12:' * 60,
+    '24.04.2013 ' * 20,
+    'a1' * 100,
+    '1-2 3,4 ' * 30,
+    '2013' * 50,
+    ]
+
+
+def bench_adversarial(repeat=20):
+    """
+    Latency of parsedatetime for hostile strings with and without BUDGET.
+    """
+    timeparser.ENDIAN.set('little')
+    strings = ADVERSARIAL + [s[:40] for s in ADVERSARIAL]
+    _report('adversarial unlimited', _latencies(timeparser.parsedatetime, strings, repeat))
+    timeparser.BUDGET.set(max_length=64, max_formats=200, max_pairs=20, timeout=0.005)
+    try:
+        _report('adversarial budgeted', _latencies(timeparser.parsedatetime, strings, repeat))
+    finally:
+        timeparser.BUDGET.set()
+
+
+def bench_stream(n=20000):
+    """
+    StreamParser versus parsedatetime on a sorted stream of timestamps.
+    """
+    import datetime
+    timeparser.ENDIAN.set('little')
+    start = datetime.datetime(2013, 4, 24, 23, 59, 58)
+    step = datetime.timedelta(milliseconds=7)
+    lines = [(start + step * i).strftime('%d.%m.%Y %H:%M:%S') for i in range(n)]
+    parser = timeparser.StreamParser('datetime')
+    t0 = time.time()
+    for line in lines: parser(line)
+    t1 = time.time()
+    for line in lines[:n // 10]: timeparser.parsedatetime(line)
+    t2 = time.time()
+    print('stream: StreamParser %.1fus/line, parsedatetime %.1fus/line' % (
+        (t1 - t0) / n * 1e6, (t2 - t1) / (n // 10) * 1e6))
+
+
+def bench_column(n=200000):
+    """
+    decode_column versus parsedatetime on a column of fixed-width timestamps.
+    """
+    import datetime
+    if not timeparser.numpy:
+        print('column: numpy not available')
+        return
+    timeparser.ENDIAN.set('little')
+    start = datetime.datetime(2013, 4, 24, 23, 59, 58)
+    step = datetime.timedelta(seconds=37)
+    column = [(start + step * i).strftime('%d.%m.%Y %H:%M:%S') for i in range(n)]
+    column = timeparser.numpy.array(column)
+    t0 = time.time()
+    timeparser.decode_column(column)
+    t1 = time.time()
+    for string in column[:n // 100]: timeparser.parsedatetime(string)
+    t2 = time.time()
+    print('column: decode_column %.0f rows/s, parsedatetime %.0f rows/s' % (
+        n / (t1 - t0), (n // 100) / (t2 - t1)))
+
+
+def bench_many(n=20000):
+    """
+    parse_many versus parsedate on a column of mixed layouts.
+    """
+    import datetime
+    timeparser.ENDIAN.set('little')
+    start = datetime.date(2013, 4, 24)
+    layouts = ['%d.%m.%Y', '%d/%m/%y', '%d %b %Y']
+    column = [(start + datetime.timedelta(days=i % 1000)).strftime(layouts[i % 3])
+        for i in range(n)]
+    t0 = time.time()
+    timeparser.parse_many(column)
+    t1 = time.time()
+    for string in column[:n // 10]: timeparser.parsedate(string)
+    t2 = time.time()
+    print('many: parse_many %.1fus/row, parsedate %.1fus/row' % (
+        (t1 - t0) / n * 1e6, (t2 - t1) / (n // 10) * 1e6))
+    t0 = time.time()
+    dates = timeparser.parse_many(column, intern=True)
+    t1 = time.time()
+    print('many: interned %.1fus/row, %d objects for %d rows' % (
+        (t1 - t0) / n * 1e6, len(set(map(id, dates))), n))
+
+
+def bench_soak(n=1000000, rounds=5):
+    """
+    Cost per call and memory of format-classes over n calls. The tables of
+    formats are dropped every 100 calls, as after a change of configuration.
+    """
+    timeparser.ENDIAN.set('little')
+    samples = [
+        (timeparser.TimeFormats, '23:44:05.123', dict(figures=[True] * 4)),
+        (timeparser.TimeFormats, None, dict(figures=[True] * 4)),
+        (timeparser.DateFormats, '24 Apr 2013', dict()),
+        (timeparser.DateFormats, None, dict()),
+        ]
+    size = lambda: len(gc.get_objects())
+    if tracemalloc:
+        tracemalloc.start()
+        size = lambda: tracemalloc.get_traced_memory()[0]
+    try:
+        for r in range(rounds):
+            t0 = time.time()
+            for x in range(n // rounds // len(samples)):
+                if not x % 100: timeparser._TABLES.clear()
+                for cls, string, kwargs in samples: cls(string, **kwargs)
+            t1 = time.time()
+            gc.collect()
+            print('soak: round %d  %.1fus/call  %d %s' % (
+                r + 1, (t1 - t0) / (n // rounds) * 1e6, size(),
+                'bytes' if tracemalloc else 'objects'))
+    finally:
+        if tracemalloc: tracemalloc.stop()
+
+
+BENCHMARKS = dict(
+    memory = bench_memory,
+    adversarial = bench_adversarial,
+    stream = bench_stream,
+    column = bench_column,
+    many = bench_many,
+    soak = bench_soak,
+    )
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or sorted(BENCHMARKS):
+        BENCHMARKS[name]()
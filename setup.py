@@ -16,7 +16,7 @@ setup(
     download_url = "https://pypi.python.org/packages/source/t/timeparser/timeparser-{version}.tar.gz".format(version=VERSION),
     description = 'A python-module to parse strings to time-, date-, datetime- or timedelta-objects.',
     long_description = open('README.rst').read() if os.path.isfile('README.rst') else str(),
-    py_modules = ["timeparser"],
+    py_modules = ["timeparser", "timeparser_server", "timeparser_replay"],
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
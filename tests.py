@@ -1,6 +1,14 @@
 import unittest
 import datetime
+import tempfile
+import pickle
+import operator
+import os
+import shutil
+import threading
 import timeparser
+import timeparser_server
+import timeparser_replay
 
 
 #TODO: write more tests!
@@ -42,6 +50,27 @@ class ParserTests(unittest.TestCase):
         self.assertIsInstance(timeparser.DatetimeFormats(), list)
         self.assertIsInstance(timeparser.DateFormats(), list)
 
+    def test_pickle_formats(self):
+        for formats in (timeparser.TimeFormats('23:44'), timeparser.DateFormats('24.4.2013'),
+                        timeparser.DatetimeFormats('24.4.2013 23:44')):
+            for protocol in (0, 1, 2):
+                copy = pickle.loads(pickle.dumps(formats, protocol))
+                self.assertEqual(copy, formats)
+                self.assertIs(type(copy), type(formats))
+                self.assertEqual(copy._seps, formats._seps)
+
+    def test_datetimeformats_product(self):
+        product = timeparser.DatetimeFormats.product()
+        self.assertIsInstance(product, timeparser.FormatProduct)
+        self.assertIs(timeparser.DatetimeFormats.product(), product)
+        formats = timeparser.DatetimeFormats()
+        self.assertEqual(formats, list(product))
+        self.assertIs(formats[-1], timeparser.DatetimeFormats()[-1])
+        self.assertEqual(len(['x'] + formats), len(product) + 1)
+        self.assertEqual('\n'.join(formats).count('\n'), len(product) - 1)
+        self.assertIn('%d.%m.%Y %H:%M', formats)
+        self.assertNotIn('%d.%m.%Y#%H:%M', formats)
+
     def test_parsetime(self):
         parser = timeparser.parsetime
         time = datetime.time
@@ -73,6 +102,21 @@ class ParserTests(unittest.TestCase):
         self.assertEqual(parser('1. 4.', today=today), date(today.year, 1, 4))
         self.assertEqual(parser('13 1.4.'), date(2013, 1, 4))
 
+    def test_monthnames(self):
+        parser = timeparser.parsedate
+        date = datetime.date
+        timeparser.DateFormats.config(allow_month_name=True)
+        self.assertEqual(parser('3 janvier 2013'), date(2013,1,3))
+        self.assertEqual(parser('24 DEZ 2013'), date(2013,12,24))
+        self.assertEqual(parser(u'3 M\xe4rz 2013'), date(2013,3,3))
+        self.assertEqual(parser('3 sept 2013'), date(2013,9,3))
+        self.assertEqual(timeparser.parsedatetime('3 Mai 2013,23:44'),
+                         datetime.datetime(2013,5,3,23,44))
+        self.assertRaises(ValueError, parser, '3 foo 2013')
+        # month-names without separators
+        self.assertEqual(parser('1Nov2013'), date(2013,11,1))
+        self.assertEqual(parser('3Jan2013'), date(2013,1,3))
+
     def test_parsedatetime(self):
         parser = timeparser.parsedatetime
         dtime = datetime.datetime
@@ -82,6 +126,172 @@ class ParserTests(unittest.TestCase):
         self.assertEqual(parser('24.3.2013,23:44'), dtime(2013,3,24,23,44))
         self.assertEqual(parser('24.3. 23:44'), dtime(today.year,3,24,23,44))
         self.assertEqual(parser('24. 23:44'), dtime(today.year,today.month,24,23,44))
+        self.assertEqual(parser('24 Apr 2013 23:44'), dtime(2013,4,24,23,44))
+        self.assertRaises(ValueError, parser, '20:00 24 Apr 2013')
+        timeparser.DatetimeFormats.config(allow_time_first=True)
+        self.assertEqual(parser('20:00 24 Apr 2013'), dtime(2013,4,24,20,0))
+        timeparser.DatetimeFormats.config(allow_time_first=False)
+
+    def test_output(self):
+        def epoch(dtime):
+            delta = dtime - datetime.datetime(1970, 1, 1)
+            return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+        self.assertEqual(timeparser.parsedatetime('24.3.2013,23:44', output='fields'),
+                         (2013, 3, 24, 23, 44, 0, 0))
+        self.assertEqual(timeparser.parsedatetime('24.3.2013,23:44', output='epoch'),
+                         epoch(datetime.datetime(2013, 3, 24, 23, 44)))
+        self.assertEqual(timeparser.parsedatetime('1.1.1950 0:1', output='epoch'),
+                         epoch(datetime.datetime(1950, 1, 1, 0, 1)))
+        today = datetime.date(2012, 2, 3)
+        self.assertEqual(timeparser.parsedate('24', today=today, output='fields'), (2012, 2, 24))
+        self.assertEqual(timeparser.parsedate('3 Apr 2013', output='epoch'),
+                         epoch(datetime.datetime(2013, 4, 3)))
+        self.assertEqual(timeparser.parsetime('23:44:05', output='fields'), (23, 44, 5, 0))
+        self.assertEqual(timeparser.parsetime('00:01', output='epoch'), 60000000)
+        self.assertRaises(ValueError, timeparser.parsedate, '31', today=today, output='fields')
+        self.assertRaises(ValueError, timeparser.parsedate, '24.3.2013', output='bla')
+
+    def test_epoch(self):
+        parser = timeparser.parsedatetime
+        dtime = datetime.datetime
+        self.assertEqual(parser('1366843445', allow_epoch=True), dtime(2013,4,24,22,44,5))
+        self.assertEqual(parser('1366843445.25', allow_epoch=True), dtime(2013,4,24,22,44,5,250000))
+        self.assertEqual(parser('1366843445250', allow_epoch=True), dtime(2013,4,24,22,44,5,250000))
+        self.assertEqual(parser('1366843445250001', allow_epoch=True), dtime(2013,4,24,22,44,5,250001))
+        self.assertEqual(parser('1366843445', allow_epoch=True, output='fields'), (2013,4,24,22,44,5,0))
+        self.assertEqual(parser('1366843445', allow_epoch=True, output='epoch'), 1366843445000000)
+        self.assertEqual(parser('24.3.2013,23:44', allow_epoch=True), dtime(2013,3,24,23,44))
+        self.assertNotEqual(parser('1366843445'), dtime(2013,4,24,22,44,5))
+        # digits out of EPOCH_RANGE are left to the formats
+        timeparser.ENDIAN.set('big')
+        self.assertEqual(parser('201304242344', allow_epoch=True), dtime(2013,4,24,23,44))
+        timeparser.ENDIAN.set('little')
+        timeparser.DatetimeFormats.config(epoch_range=(1970, 2100))
+        self.assertEqual(parser('201304242344', allow_epoch=True),
+                         dtime(1976,5,18,21,50,42,344000))
+        timeparser.DatetimeFormats.config(epoch_range=(1980, 2100))
+
+    def test_lexer(self):
+        tokens = timeparser._lex('24Apr. 2013,23h')
+        self.assertEqual(tokens, [('d', '24'), ('a', 'Apr'), ('s', '. '), ('d', '2013'),
+                                  ('s', ','), ('d', '23'), ('a', 'h')])
+        self.assertEqual(timeparser._cut(tokens, 3), ([('d', '24'), ('a', 'A')],
+                                                      [('a', 'pr')] + tokens[2:]))
+        formats = timeparser.DateFormats('24.04.2013', tokens=timeparser._lex('24.04.2013'))
+        self.assertEqual(formats, timeparser.DateFormats('24.04.2013'))
+
+    def test_prefilter(self):
+        prefilter = timeparser._prefilter(timeparser.DateFormats)
+        for string in ('bla blub foo bar', '13.04.24#23:44', '1.2.3.4', '123456789', '--'):
+            self.assertTrue(prefilter.rejects(string))
+            self.assertRaises(ValueError, timeparser.parsedate, string)
+        for string in ('24.04.2013', '24 Apr 2013', '24', '24042013'):
+            self.assertFalse(prefilter.rejects(string))
+        self.assertTrue(timeparser._prefilter(timeparser.TimeFormats).rejects('23:44 Apr'))
+        self.assertFalse(timeparser._prefilter(timeparser.TimeFormats).rejects('23h44'))
+        self.assertFalse(timeparser._prefilter(timeparser.DatetimeFormats).rejects('24 Apr 2013,23:44'))
+        timeparser.DateFormats.config(try_hard=True)
+        self.assertIsNone(timeparser._prefilter(timeparser.DateFormats))
+        timeparser.DateFormats.config(try_hard=False)
+
+    def test_is_parseable(self):
+        today = datetime.date(2013, 4, 1)
+        self.assertTrue(timeparser.is_parseable('24.04.2013'))
+        self.assertTrue(timeparser.is_parseable('23:44', 'time'))
+        self.assertTrue(timeparser.is_parseable('24.4.2013 23:44', 'datetime'))
+        self.assertFalse(timeparser.is_parseable('31.04.2013'))
+        self.assertFalse(timeparser.is_parseable('31.', today=today))
+        self.assertFalse(timeparser.is_parseable('bla blub', 'datetime'))
+        self.assertTrue(timeparser.is_parseable('2013-04-24', formats=['%Y-%m-%d']))
+        strings = ['24.04.2013', 'bla', '31.04.2013', '24.04.2013', '30.']
+        self.assertEqual(timeparser.validate_many(strings, today=today),
+                         [True, False, False, True, True])
+        self.assertEqual(timeparser.validate_many(strings, formats=['%d.'], today=today), [False] * 4 + [True])
+
+    def test_with_format(self):
+        date, fmt = timeparser.parsedate('24.04.2013', with_format=True)
+        self.assertEqual((date, fmt), (datetime.date(2013, 4, 24), '%d.%m.%Y'))
+        self.assertEqual(timeparser.parsetime('23h', with_format=True)[1], '%Hh')
+        self.assertEqual(timeparser.parsedatetime('24 Sep 2013 23:44', with_format=True)[1],
+                         '%d %b %Y %H:%M')
+        dates = [date, datetime.date(1848, 9, 1)]
+        self.assertEqual(timeparser.format_many(dates, fmt), ['24.04.2013', '01.09.1848'])
+        self.assertEqual(timeparser.format_many(dates, '%d %b %y'), ['24 Apr 13', '01 Sep 48'])
+        self.assertEqual(timeparser.format_many(dates[:1], '%j'), ['114'])
+        date, fmt = timeparser.parsedate(u'3 M\xe4rz 2013', with_format=True)
+        self.assertEqual(timeparser.format_many([date], fmt, 'de'), [u'03 M\xe4rz 2013'])
+        self.assertEqual(timeparser.format_many(dates, '%d %b', 'fr'), ['24 Avr', '01 Sept'])
+        self.assertRaises(ValueError, timeparser.format_many, dates, fmt, 'xx')
+        self.assertRaises(ValueError, timeparser.format_many, dates, '%b %j', 'de')
+
+    def test_offset(self):
+        self.assertRaises(ValueError, timeparser.parsedatetime, '24.04.2013 23:44Z')
+        timeparser.TimeFormats.config(allow_offset=True)
+        timeparser.DatetimeFormats.config(allow_offset=True)
+        utc = timeparser.UTC
+        dtime = datetime.datetime(2013, 4, 24, 23, 44, tzinfo=utc)
+        self.assertEqual(timeparser.parsedatetime('24.04.2013 23:44Z'), dtime)
+        self.assertEqual(timeparser.parsedatetime('24.04.2013 23:44 UTC'), dtime)
+        self.assertEqual(timeparser.parsedatetime('24.04.2013 23:44+0200'),
+                         dtime - datetime.timedelta(hours=2))
+        self.assertEqual(timeparser.parsedatetime('24.04.2013 23:44-02:30').utcoffset(),
+                         -datetime.timedelta(hours=2, minutes=30))
+        self.assertEqual(timeparser.parsetime('01:00+02:00', output='fields'), (23, 0, 0, 0))
+        self.assertEqual(timeparser.parsetime('01:00 Z').tzinfo, utc)
+        self.assertEqual(timeparser.parsedatetime('24.04.2013 01:00+0200', output='fields'),
+                         (2013, 4, 23, 23, 0, 0, 0))
+        self.assertIsNone(timeparser.parsedatetime('24.04.2013 23:44').tzinfo)
+        self.assertRaises(ValueError, timeparser.parsedate, '24.04.2013Z')
+        self.assertEqual(timeparser.parse_many(['23:44+02:00', '23:45', '23:46+0000'], 'time'),
+                         [timeparser.parsetime(s) for s in ['23:44+02:00', '23:45', '23:46+0000']])
+        dtimes = timeparser.parse_many(['24.4.13 23:44+02:00', '24.4.13 21:44Z'], 'datetime', intern=True)
+        self.assertEqual([d.tzinfo.minutes for d in dtimes], [120, 0])
+        parser = timeparser.StreamParser('datetime', output='epoch')
+        self.assertEqual(parser('01.01.1970 02:00+02:00'), 0)
+        self.assertEqual(parser('01.01.1970 02:00+01:00'), 3600000000)
+        self.assertEqual(parser('01.01.1970 02:00'), 7200000000)
+        timeparser.TimeFormats.config(allow_offset=False)
+        timeparser.DatetimeFormats.config(allow_offset=False)
+
+    def test_compiled_formats(self):
+        formats = timeparser.CompiledFormats(['%d.%m.%Y', '%d.%m', '%I%p'])
+        today = datetime.date(2000, 2, 3)
+        self.assertEqual(timeparser.parsedate('24.04.2013', formats), datetime.date(2013, 4, 24))
+        self.assertEqual(timeparser.parsedate('24.04', formats, today), datetime.date(2000, 4, 24))
+        self.assertEqual(timeparser.parsetime('11PM', formats), datetime.time(23))
+        self.assertEqual(timeparser.parsedate('24.04', formats, today, output='fields'), (2000, 4, 24))
+        self.assertRaises(ValueError, timeparser.parsedate, '31.04', formats)
+        self.assertRaises(ValueError, timeparser.parsedate, '2013-04-24', formats)
+        self.assertEqual(pickle.loads(pickle.dumps(formats)), formats)
+
+    def test_try_parse(self):
+        self.assertEqual(timeparser.try_parsetime('23:44'), datetime.time(23, 44))
+        self.assertEqual(timeparser.try_parsetime('bla', default=False), False)
+        self.assertEqual(timeparser.try_parsedate('24.04.2013', output='fields'), (2013, 4, 24))
+        self.assertIsNone(timeparser.try_parsedate('31.04.2013'))
+        self.assertIsNone(timeparser.try_parsedatetime('bla blub'))
+        self.assertEqual(timeparser.try_parsedatetime('11PM', ['%I%p'], output='fields')[3], 23)
+        self.assertEqual(timeparser.try_parsetimedelta('1h 2m'), datetime.timedelta(hours=1, minutes=2))
+        self.assertIsNone(timeparser.try_parsetimedelta('20h 0s 4'))
+
+    def test_parse_many(self):
+        today = datetime.date(2013, 4, 1)
+        strings = ['24.04.2013', '24 Apr 2013', 'bla', '25.04.2013', '31.04.2013', '25 Apr 2013']
+        dates = [datetime.date(2013, 4, 24), datetime.date(2013, 4, 25)]
+        self.assertEqual(timeparser.parse_many(strings, today=today, default=None),
+                         [dates[0], dates[0], None, dates[1], None, dates[1]])
+        self.assertRaises(ValueError, timeparser.parse_many, strings)
+        self.assertEqual(timeparser.parse_many(['24.04.2013 23:44', '24.4. 23:44'], 'datetime', today, 'fields'),
+                         [(2013, 4, 24, 23, 44, 0, 0)] * 2)
+        dates = timeparser.parse_many(strings, today=today, default=None, intern=True)
+        self.assertTrue(dates[0] is dates[1] and dates[3] is dates[5])
+        self.assertFalse(timeparser.parse_many(strings[:2], today=today)[0] is dates[1])
+        self.assertEqual(timeparser.parse_many(['bla', 'bla'], default=0, intern=True), [0, 0])
+        limit, timeparser._INTERN_MAX = timeparser._INTERN_MAX, 1
+        try: dates = timeparser.parse_many(strings[:1] + strings[3:4] * 2, intern=True)
+        finally: timeparser._INTERN_MAX = limit
+        self.assertEqual(dates[1], dates[2])
+        self.assertFalse(dates[1] is dates[2])
 
     def test_parsetimedelta(self):
         parser = timeparser.parsetimedelta
@@ -92,6 +302,16 @@ class ParserTests(unittest.TestCase):
         self.assertRaises(ValueError, parser, '20h 0s 4')
 
 
+    def test_split_ties(self):
+        # on equal ranks the earlier split between date and time wins
+        parser = timeparser.parsedatetime
+        today = datetime.date(2013, 5, 6)
+        dt = datetime.datetime
+        self.assertEqual(parser('02.Feb 09 43', today=today), dt(2013, 2, 2, 9, 43))
+        timeparser.ENDIAN.set('big')
+        self.assertEqual(parser('06 14 08', today=today), dt(2013, 5, 6, 14, 8))
+
+
 class EndianTests(unittest.TestCase):
     def test_endian(self):
         endian = timeparser.ENDIAN
@@ -116,6 +336,391 @@ class TodayTests(unittest.TestCase):
         self.assertEqual(today, datetime.date(1,2,3))
 
 
+class MonthNamesTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+        self.addCleanup(timeparser.MONTH_NAMES.pop, 'nl', None)
+
+    def test_add_language(self):
+        names = ['januari', 'februari', 'maart', 'april', 'mei', 'juni', 'juli',
+            'augustus', 'september', 'oktober', 'november', 'december']
+        timeparser.warmup()
+        self.assertRaises(ValueError, timeparser.parsedate, '3 maart 2013')
+        state = timeparser.config_hash()
+        timeparser.MONTH_NAMES['nl'] = [(n, n[:3]) for n in names]
+        self.assertNotEqual(timeparser.config_hash(), state)
+        self.assertEqual(timeparser.parsedate('3 maart 2013'), datetime.date(2013, 3, 3))
+        self.assertEqual(timeparser.parsedate('3 mei 2013'), datetime.date(2013, 5, 3))
+        del timeparser.MONTH_NAMES['nl']
+        self.assertEqual(timeparser.config_hash(), state)
+        self.assertRaises(ValueError, timeparser.parsedate, '3 maart 2013')
+
+    def test_read_only_names(self):
+        names = timeparser.MONTH_NAMES['en']
+        self.assertRaises(TypeError, operator.setitem, names, 0, ('jan', 'jan'))
+
+
+class FormatCacheTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'formats.cache')
+
+    def tearDown(self):
+        timeparser.ENDIAN.set('little')
+        shutil.rmtree(self.dir)
+
+    def test_save_and_load(self):
+        formats = timeparser.DatetimeFormats()
+        timeparser.save_formats(self.path)
+        timeparser._TABLES.clear()
+        self.assertTrue(timeparser.load_formats(self.path))
+        self.assertEqual(timeparser.DatetimeFormats(), formats)
+
+    def test_warmup(self):
+        timeparser._TABLES.clear()
+        summary = timeparser.warmup(['24.4.2013', '23:44', '24.4.2013 23:44'])
+        self.assertTrue(summary['tables'] > 3)
+        self.assertTrue(summary['matchers'] > len(timeparser.DateFormats()))
+
+    def test_warmup_prefilters(self):
+        timeparser._PREFILTERS.clear()
+        summary = timeparser.warmup()
+        self.assertEqual(summary['prefilters'], 3)
+        self.assertEqual(len(timeparser._PREFILTERS), 3)
+
+    def test_mismatch(self):
+        self.assertFalse(timeparser.load_formats(self.path))
+        timeparser.save_formats(self.path)
+        timeparser.ENDIAN.set('big')
+        self.assertFalse(timeparser.load_formats(self.path))
+
+class ResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+        timeparser.RESULTS.set(2)
+
+    def tearDown(self):
+        timeparser.RESULTS.set(0)
+
+    def test_cache(self):
+        cache = timeparser.RESULTS
+        date = timeparser.parsedate('24.3.2013')
+        self.assertIs(timeparser.parsedate('24.3.2013'), date)
+        self.assertRaises(ValueError, timeparser.parsedate, 'bla blub')
+        self.assertRaises(ValueError, timeparser.parsedate, 'bla blub')
+        timeparser.parsetimedelta('w3 h4')
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 3)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['failures'], 1)
+        timeparser.parsedate('25.3.2013')
+        self.assertEqual(cache.stats()['failures'], 0)
+
+    def test_config(self):
+        self.assertEqual(timeparser.parsedate('24', today=datetime.date(1, 2, 3)),
+                         datetime.date(1, 2, 24))
+        self.assertEqual(timeparser.parsedate('24', today=datetime.date(1, 3, 3)),
+                         datetime.date(1, 3, 24))
+        state = timeparser._config_state()
+        self.assertIs(timeparser._config_state(), state)
+        timeparser.DateFormats.config(allow_month_name=False)
+        self.assertNotEqual(timeparser._config_state(), state)
+        self.assertRaises(ValueError, timeparser.parsedate, '24 Apr 2013')
+        timeparser.DateFormats.config(allow_month_name=True)
+        self.assertEqual(timeparser.parsedate('24 Apr 2013'), datetime.date(2013, 4, 24))
+
+    def test_iterator(self):
+        date = datetime.date(2013, 3, 4)
+        for i in range(2):
+            self.assertEqual(timeparser.parsedate('03.04.2013', iter(['%m.%d.%Y'])), date)
+        self.assertEqual(timeparser.parsetime('23:44', iter(['%H:%M'])),
+                         datetime.time(23, 44))
+
+class FormatStoreTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'formats.db')
+        timeparser.LEARNED.open(self.path)
+
+    def tearDown(self):
+        timeparser.LEARNED.close()
+        timeparser.ENDIAN.set('little')
+        shutil.rmtree(self.dir)
+
+    def test_learn(self):
+        store = timeparser.LEARNED
+        self.assertIsNone(store.lookup('date', '24.04.2013'))
+        self.assertEqual(timeparser.parsedate('24.04.2013'), datetime.date(2013, 4, 24))
+        self.assertEqual(store.lookup('date', '25.12.1999'), '%d.%m.%Y')
+        self.assertIsNone(store.lookup('datetime', '25.12.1999'))
+        self.assertRaises(ValueError, timeparser.parsedate, '31.04.2013')
+        self.assertEqual(timeparser.parsedate('24 Apr 2013'), datetime.date(2013, 4, 24))
+
+    def test_results(self):
+        # a cached result mustn't hide that the learned formats changed
+        timeparser.RESULTS.set(10)
+        self.addCleanup(timeparser.RESULTS.set, 0)
+        store = timeparser.LEARNED
+        timeparser.parsedate('24.04.2013')
+        generation = store.generation
+        timeparser.parsedate('24.04.2013')
+        self.assertEqual(timeparser.RESULTS.stats()['hits'], 0)
+        self.assertEqual(store.generation, generation)
+        timeparser.parsedate('24.04.2013')
+        self.assertEqual(timeparser.RESULTS.stats()['hits'], 1)
+
+    def test_same_shape(self):
+        # '1331' is parsed by its second format, which must not be learned
+        today = datetime.date(2013, 1, 1)
+        self.assertEqual(timeparser.parsedate('1331', today=today), datetime.date(2031, 3, 1))
+        self.assertIsNone(timeparser.LEARNED.lookup('date', '2403'))
+        self.assertEqual(timeparser.parsedate('2403', today=today), datetime.date(2013, 3, 24))
+        self.assertEqual(timeparser.LEARNED.lookup('date', '1331'), '%d%m')
+        self.assertEqual(timeparser.parsedate('1331', today=today), datetime.date(2031, 3, 1))
+        timeparser.LEARNED.sync()
+        other = timeparser.FormatStore(self.path)
+        self.assertEqual(other.lookup('date', '2403'), '%d%m')
+
+    def test_share(self):
+        timeparser.parsedatetime('24.04.2013 23:44')
+        timeparser.LEARNED.sync()
+        other = timeparser.FormatStore(self.path)
+        self.assertEqual(other.lookup('datetime', '01.01.2000 00:00'), '%d.%m.%Y %H:%M')
+        timeparser.ENDIAN.set('big')
+        self.assertIsNone(other.lookup('datetime', '01.01.2000 00:00'))
+
+class RecorderTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'corpus.jsonl')
+
+    def tearDown(self):
+        timeparser.RECORDER.close()
+        timeparser.ENDIAN.set('little')
+        timeparser.TODAY.set()
+        shutil.rmtree(self.dir)
+
+    def test_record(self):
+        recorder = timeparser.RECORDER
+        recorder.open(self.path, rate=1)
+        timeparser.parsedate('24.04.2013', today=datetime.date(2000, 1, 1))
+        timeparser.try_parsedatetime('bla')
+        timeparser.parsetime('23:44', ['%H:%M'], output='epoch')
+        timeparser.ENDIAN.set('big')
+        timeparser.parsetimedelta('1h 2m')
+        recorder.close()
+        self.assertEqual(recorder.recorded, 4)
+        corpus = timeparser_replay.load(self.path)
+        self.assertEqual([c['kind'] for x, c in corpus], ['date', 'datetime', 'time', 'timedelta'])
+        self.assertEqual(corpus[0][1]['today'], '2000-01-01')
+        self.assertNotIn('output', corpus[0][1])
+        self.assertEqual(corpus[2][1]['formats'], ['%H:%M'])
+        self.assertEqual(corpus[3][0]['ENDIAN'], 'big')
+        self.assertEqual(corpus[0][0]['LEARNED'], False)
+        self.assertIn('de', corpus[0][0]['MONTH_NAMES'])
+        self.assertEqual(corpus[0][0]['BUDGET']['max_length'], None)
+        recorder.open(self.path, rate=0)
+        timeparser.parsedate('2013-04-24')
+        recorder.close()
+        self.assertEqual(len(timeparser_replay.load(self.path)), 4)
+
+    def test_replay(self):
+        timeparser.RECORDER.open(self.path, rate=1)
+        for string in ['24.04.2013', '25.04.2013', '31.04.2013', '24 Apr 2013']:
+            timeparser.try_parsedate(string)
+        timeparser.RECORDER.close()
+        timeparser.ENDIAN.set('big')
+        corpus = timeparser_replay.load(self.path)
+        run = timeparser_replay.replay(corpus)
+        self.assertEqual(run['results'][0], repr(datetime.date(2013, 4, 24)))
+        self.assertEqual(run['results'][2], 'ValueError')
+        self.assertEqual(timeparser_replay.summary(run)['calls'], 4)
+        many = timeparser_replay.replay(corpus, 'many')
+        self.assertEqual(timeparser_replay.differences(corpus, run, many), [])
+        # arguments unknown to the parser don't abort the replay
+        call = dict(kind='timedelta', string='1h', output='epoch')
+        self.assertTrue(timeparser_replay._call(call).startswith('TypeError'))
+
+    def test_sources(self):
+        timeparser.RECORDER.open(self.path, rate=1)
+        timeparser.parse_many(['24.04.2013', '25.04.2013'], output='epoch')
+        timeparser.StreamParser('time')('23:44')
+        coalescer = timeparser_server.Coalescer('date')
+        coalescer(['26.04.2013'])
+        coalescer.close()
+        if timeparser.numpy: timeparser.decode_column(['27.04.2013'], 'date')
+        timeparser.RECORDER.close()
+        corpus = timeparser_replay.load(self.path)
+        sources = ['parse_many', 'parse_many', 'StreamParser', 'server']
+        if timeparser.numpy: sources.append('decode_column')
+        self.assertEqual([c['source'] for x, c in corpus], sources)
+        self.assertEqual(corpus[0][1]['output'], 'epoch')
+        self.assertEqual(timeparser_replay.replay(corpus)['results'][3],
+                         repr(datetime.date(2013, 4, 26)))
+
+
+class BudgetTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+
+    def tearDown(self):
+        timeparser.BUDGET.set()
+
+    def test_limits(self):
+        budget = timeparser.BUDGET
+        exc = timeparser.BudgetExceeded
+        budget.set(max_length=10)
+        self.assertRaises(exc, timeparser.parsedatetime, '1 ' * 100)
+        self.assertRaises(exc, timeparser.DateFormats, '1 ' * 100)
+        self.assertEqual(timeparser.parsetime('23:44'), datetime.time(23, 44))
+        budget.set(max_pairs=3)
+        self.assertRaises(exc, timeparser.parsedatetime, '1366843445')
+        budget.set(max_formats=1)
+        self.assertRaises(exc, timeparser.parsedate, '243')
+        budget.set(timeout=-1)
+        self.assertRaises(exc, timeparser.parsedatetime, '24.3.2013 23:44')
+        self.assertTrue(issubclass(exc, ValueError))
+
+    def test_parse_many(self):
+        timeparser.BUDGET.set(max_length=10)
+        strings = ['24.04.2013', '1 ' * 10, '1 ' * 10]
+        self.assertEqual(timeparser.parse_many(strings, default=None),
+                         [datetime.date(2013, 4, 24), None, None])
+        self.assertEqual(timeparser.parse_many(strings, default=None),
+                         [timeparser.try_parsedate(s) for s in strings])
+        self.assertRaises(timeparser.BudgetExceeded, timeparser.parse_many, strings)
+
+class StreamParserTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+
+    def test_stream(self):
+        parser = timeparser.StreamParser('datetime')
+        dtime = datetime.datetime
+        self.assertEqual(parser('24.04.2013 23:59:58'), dtime(2013,4,24,23,59,58))
+        self.assertEqual(parser('24.04.2013 23:59:59'), dtime(2013,4,24,23,59,59))
+        self.assertEqual(parser('25.04.2013 00:00:00'), dtime(2013,4,25,0,0,0))
+        self.assertRaises(ValueError, parser, '31.04.2013 00:00:00')
+        self.assertEqual(parser('1.5.2013 0:00'), dtime(2013,5,1,0,0))
+        self.assertEqual((parser.hits, parser.misses), (2, 2))
+        self.assertRaises(ValueError, parser, '24.04.2013#23:59:59')
+
+    def test_output(self):
+        parser = timeparser.StreamParser('time', output='fields')
+        self.assertEqual(parser('23:44:05'), (23, 44, 5, 0))
+        self.assertEqual(parser('23:44:06'), (23, 44, 6, 0))
+        self.assertEqual(parser.hits, 1)
+
+    def test_offset_fallback(self):
+        # '-1130' is no utc-offset, if '24.04.2013' alone couldn't be parsed
+        seps = timeparser.DatetimeFormats.SEPS
+        timeparser.DatetimeFormats.config(allow_offset=True, seps=[' ', '-'])
+        self.addCleanup(timeparser.DatetimeFormats.config, allow_offset=False, seps=seps)
+        parser = timeparser.StreamParser('datetime')
+        for string in ('24.04.2013-1130', '24.04.2013 23:44+02:00'):
+            self.assertEqual(parser(string), timeparser.parsedatetime(string))
+        self.assertEqual(parser('24.04.2013-1130'), datetime.datetime(2013, 4, 24, 11, 30))
+
+
+@unittest.skipUnless(timeparser.numpy, 'numpy is not installed')
+class DecodeColumnTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+
+    def test_decode(self):
+        numpy = timeparser.numpy
+        column = ['24.04.2013 23:44', '29.02.2012 00:01']
+        expected = numpy.array(['2013-04-24T23:44', '2012-02-29T00:01'], 'datetime64[us]')
+        self.assertTrue((timeparser.decode_column(column) == expected).all())
+        today = datetime.date(2000, 1, 1)
+        dates = timeparser.decode_column(['24.04.', '01.12.'], 'date', today)
+        self.assertEqual(dates.tolist(), [datetime.date(2000, 4, 24), datetime.date(2000, 12, 1)])
+        self.assertEqual(timeparser.decode_column([]).dtype, numpy.dtype('datetime64[us]'))
+        self.assertEqual(len(timeparser.decode_column([], 'date')), 0)
+        times = timeparser.decode_column(['23:44:05'], 'time')
+        self.assertEqual(times[0], numpy.timedelta64(85445, 's'))
+        column = numpy.array(['24.04.2013', 'bla', '25.04.2013'])[::2]
+        dates = timeparser.decode_column(column, 'date')
+        self.assertEqual(dates.tolist(), [datetime.date(2013, 4, 24), datetime.date(2013, 4, 25)])
+
+    def test_invalid(self):
+        column = ['24.04.2013', '31.04.2013', '24-04-2013', '24.04.201']
+        self.assertRaises(ValueError, timeparser.decode_column, column, 'date')
+        self.assertRaises(ValueError, timeparser.decode_column, ['4.4.2013'], 'date')
+        dates = timeparser.decode_column(column, 'date', nat=True)
+        self.assertEqual(dates.tolist(), [datetime.date(2013, 4, 24), None, None, None])
+        column = [u'24.04.2013', u'24.\xc4.2013']
+        self.assertRaises(ValueError, timeparser.decode_column, column, 'date')
+        timeparser.DatetimeFormats.config(allow_offset=True)
+        self.assertRaises(ValueError, timeparser.decode_column, ['24.04.2013 23:44Z'])
+        timeparser.DatetimeFormats.config(allow_offset=False)
+
+
+class ServerTests(unittest.TestCase):
+    def setUp(self):
+        timeparser.ENDIAN.set('little')
+        self.servers = list()
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def serve(self, address, **kwargs):
+        server = timeparser_server.serve(address, **kwargs)
+        self.servers.append(server)
+        return server.server_address
+
+    def test_tcp(self):
+        client = timeparser_server.Client(self.serve(('127.0.0.1', 0)))
+        self.assertEqual(client.parse(['24.04.2013 23:44', 'bla', '24.4.13 23:44:05']),
+                         ['2013-04-24T23:44:00', '', '2013-04-24T23:44:05'])
+        self.assertEqual(client.parse([]), [])
+        self.assertEqual(client.parse(['', '\\24.04.2013 23:44', '24.04.2013 23:44']),
+                         ['', '', '2013-04-24T23:44:00'])
+        client.close()
+
+    def test_unix(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'timeparser.sock')
+        address = self.serve(path, kind='date', output='epoch', framing='length')
+        client = timeparser_server.Client(address, 'length')
+        self.assertEqual(client.parse(['01.01.1970', '31.04.2013']), ['0', ''])
+        client.close()
+
+    def test_worker_error(self):
+        coalescer = timeparser_server.Coalescer('bogus', workers=1)
+        self.addCleanup(coalescer.close)
+        self.assertRaises(KeyError, coalescer, ['24.04.2013'])
+
+    def test_warmup_before_fork(self):
+        timeparser._MATCHERS.clear()
+        coalescer = timeparser_server.Coalescer('date', workers=1)
+        self.addCleanup(coalescer.close)
+        self.assertTrue(timeparser._MATCHERS)
+        self.assertEqual(coalescer(['24.04.2013']), ['2013-04-24'])
+
+    def test_coalesce(self):
+        address = self.serve(('127.0.0.1', 0), kind='date', window=0.05)
+        results = dict()
+        def parse(day):
+            client = timeparser_server.Client(address)
+            results[day] = client.parse(['%d.04.2013' % day])
+            client.close()
+        threads = [threading.Thread(target=parse, args=(d,)) for d in range(1, 11)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(results[10], ['2013-04-10'])
+        coalescer = self.servers[0].coalescer
+        self.assertEqual(coalescer.requests, 10)
+        self.assertTrue(coalescer.batches < 10)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -71,15 +71,51 @@ Producing formats for a specific string also respects the current setting:
 """
 
 import datetime
+import time
 import re
+import os
+import hashlib
+import json
+import random
+import threading
+import operator
+import collections
+import itertools
 import subprocess
 import shlex
 
+try: import cPickle as pickle
+except ImportError: import pickle
+
+try: import sqlite3
+except ImportError: sqlite3 = None
+
+try: import numpy
+except ImportError: numpy = None
+
+try: intern
+except NameError: from sys import intern
+
+def _intern(string):
+    # python2 only interns byte-strings
+    try: return intern(string)
+    except TypeError: return string
+
 import warnings
 warnings.simplefilter('default')
 
 __version__ = '0.7.4'
 
+_CONFIG_VERSION = [0]
+
+def _config_changed():
+    """
+    Invalidate the cached :func:`_config_state`. Called whenever ENDIAN,
+    MONTH_NAMES or a class-attribute of a format-class is set.
+    """
+    _CONFIG_VERSION[0] += 1
+
+
 class Today:
     """
     Today emulates a :class:`datetime.date`-object that could be changed through
@@ -177,6 +213,7 @@ class Endian:
         self._key = self._check_key(key) or self._guess()
         for m in ('__iter__', '__getitem__', '__repr__', 'index'):
             setattr(self, m, getattr(self.OPTIONS[self._key], m))
+        _config_changed()
 
     def get(self, no_year=False, key=None):
         key = self._check_key(key) or self._key
@@ -242,6 +279,710 @@ On creation a local-default-order is guessed, but could be changed through
     order is not regarded at all.
 """
 
+class BudgetExceeded(ValueError):
+    """
+    Raised if parsing a string exceeds one of the limits of :data:`BUDGET`.
+    """
+
+
+class Budget(object):
+    """
+    Limits for the work that is spent to parse a single string.
+
+    All limits default to None, which means unlimited. To change them use
+    :meth:`set`. If a limit is exceeded :exc:`BudgetExceeded` is raised, which
+    is a subclass of :exc:`ValueError`.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self.set()
+
+    def set(self, max_length=None, max_formats=None, max_pairs=None, timeout=None):
+        """
+        Change the limits.
+
+        :keyword int max_length:    Maximal length of a string.
+        :keyword int max_formats:   Maximal number of formats a string is tried
+                                    with or :class:`DatetimeFormats` produces.
+        :keyword int max_pairs:     Maximal number of splits into a date- and a
+                                    time-part :class:`DatetimeFormats` tries.
+        :keyword float timeout:     Maximal seconds spent on a string.
+        """
+        self.max_length = max_length
+        self.max_formats = max_formats
+        self.max_pairs = max_pairs
+        self.timeout = timeout
+
+    def start(self):
+        """
+        Start the clock for the actual thread unless it already runs.
+        Returns True if the clock was started.
+        """
+        if not self.timeout or getattr(self._local, 'deadline', None): return False
+        self._local.deadline = time.time() + self.timeout
+        return True
+
+    def stop(self):
+        self._local.deadline = None
+
+    def check_length(self, string):
+        if self.max_length and len(string) > self.max_length:
+            raise BudgetExceeded("'%s...' is longer than %d characters"
+                % (string[:self.max_length], self.max_length))
+
+    def check_formats(self, count, string):
+        if self.max_formats and count > self.max_formats:
+            raise BudgetExceeded("more than %d formats for '%s'"
+                % (self.max_formats, string))
+
+    def check_pairs(self, count, string):
+        if self.max_pairs and count > self.max_pairs:
+            raise BudgetExceeded("more than %d splits for '%s'"
+                % (self.max_pairs, string))
+
+    def check_time(self, string):
+        deadline = getattr(self._local, 'deadline', None)
+        if deadline and time.time() > deadline:
+            raise BudgetExceeded("timeout of %ss exceeded for '%s'"
+                % (self.timeout, string))
+
+
+BUDGET = Budget()
+"""
+BUDGET is an instance of :class:`Budget` and limits the work of the
+`parser-functions`_ and the `format-classes`_ for a single string. By default
+there are no limits. Use :meth:`Budget.set` to get a predictable worst-case:
+
+    >>> BUDGET.set(max_length=64, max_formats=200, max_pairs=20, timeout=0.01)
+    >>> parsedatetime('1 ' * 100)
+    BudgetExceeded: '1 1 1 1 ...' is longer than 64 characters
+"""
+
+
+class _MonthNames(dict):
+    """
+    Dict of the month-names per language. The names of a language are stored
+    as tuple; setting, updating, popping or deleting a language rebuilds the lookups of
+    the parsers and changes the configuration.
+    """
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self)
+        for lang, names in dict(*args, **kwargs).items():
+            dict.__setitem__(self, lang, tuple(map(tuple, names)))
+
+    def __setitem__(self, lang, names):
+        dict.__setitem__(self, lang, tuple(map(tuple, names)))
+        _update_months()
+
+    def __delitem__(self, lang):
+        dict.__delitem__(self, lang)
+        _update_months()
+
+    def update(self, *args, **kwargs):
+        for lang, names in dict(*args, **kwargs).items():
+            dict.__setitem__(self, lang, tuple(map(tuple, names)))
+        _update_months()
+
+    def pop(self, lang, *default):
+        names = dict.pop(self, lang, *default)
+        _update_months()
+        return names
+
+
+MONTH_NAMES = _MonthNames(
+    en = [
+        ('january', 'jan'),
+        ('february', 'feb'),
+        ('march', 'mar'),
+        ('april', 'apr'),
+        ('may', 'may'),
+        ('june', 'jun'),
+        ('july', 'jul'),
+        ('august', 'aug'),
+        ('september', 'sep|sept'),
+        ('october', 'oct'),
+        ('november', 'nov'),
+        ('december', 'dec'),
+        ],
+    de = [
+        (u'januar|j\xe4nner', u'jan|j\xe4n'),
+        ('februar', 'feb'),
+        (u'm\xe4rz|maerz', u'm\xe4r|mrz'),
+        ('april', 'apr'),
+        ('mai', 'mai'),
+        ('juni', 'jun'),
+        ('juli', 'jul'),
+        ('august', 'aug'),
+        ('september', 'sep|sept'),
+        ('oktober', 'okt'),
+        ('november', 'nov'),
+        ('dezember', 'dez'),
+        ],
+    fr = [
+        ('janvier', 'janv|jan'),
+        (u'f\xe9vrier|fevrier', u'f\xe9vr|fevr|f\xe9v|fev'),
+        ('mars', 'mars|mar'),
+        ('avril', 'avr'),
+        ('mai', 'mai'),
+        ('juin', 'juin'),
+        ('juillet', 'juil'),
+        (u'ao\xfbt|aout', u'ao\xfbt|aout'),
+        ('septembre', 'sept|sep'),
+        ('octobre', 'oct'),
+        ('novembre', 'nov'),
+        (u'd\xe9cembre|decembre', u'd\xe9c|dec'),
+        ],
+    es = [
+        ('enero', 'ene'),
+        ('febrero', 'feb'),
+        ('marzo', 'mar'),
+        ('abril', 'abr'),
+        ('mayo', 'may'),
+        ('junio', 'jun'),
+        ('julio', 'jul'),
+        ('agosto', 'ago'),
+        ('septiembre|setiembre', 'sep|sept|set'),
+        ('octubre', 'oct'),
+        ('noviembre', 'nov'),
+        ('diciembre', 'dic'),
+        ],
+    it = [
+        ('gennaio', 'gen'),
+        ('febbraio', 'feb'),
+        ('marzo', 'mar'),
+        ('aprile', 'apr'),
+        ('maggio', 'mag'),
+        ('giugno', 'giu'),
+        ('luglio', 'lug'),
+        ('agosto', 'ago'),
+        ('settembre', 'set'),
+        ('ottobre', 'ott'),
+        ('novembre', 'nov'),
+        ('dicembre', 'dic'),
+        ],
+    )
+"""
+Month-names and their abbreviations per language. Alternative spellings are
+separated by '|'.
+
+Month-names are looked up in these tables instead of using the locale-dependent
+'%b' and '%B' of :meth:`datetime.datetime.strptime`. So there is no need to
+switch the locale and month-names of all languages could be parsed at once:
+
+    >>> parsedate('3 Mai 2013')
+    datetime.date(2013, 5, 3)
+    >>> parsedate('3 janvier 2013')
+    datetime.date(2013, 1, 3)
+
+Lookups are case-insensitive. Names with non-ascii-characters are only found
+in unicode-strings.
+
+Languages are added, replaced or removed by item-assignment, update, pop or
+del; the names of a language can't be changed in place:
+
+    >>> MONTH_NAMES['nl'] = [('januari', 'jan'), ('februari', 'feb'), ...]
+"""
+
+def _build_month_lookup():
+    lookup = {'%B': dict(), '%b': dict()}
+    for names in MONTH_NAMES.values():
+        for month, (full, abbr) in enumerate(names, 1):
+            for code, alternatives in (('%B', full), ('%b', abbr)):
+                for name in alternatives.split('|'):
+                    lookup[code][name] = month
+    return lookup
+
+_MONTH_LOOKUP = _build_month_lookup()
+
+def _months_key():
+    # digest of MONTH_NAMES as part of the configuration
+    names = repr(sorted(MONTH_NAMES.items())).encode('ascii')
+    return hashlib.md5(names).hexdigest()
+
+_MONTHS_KEY = _months_key()
+
+def _month_pattern(code):
+    names = sorted(map(re.escape, _MONTH_LOOKUP[code]), key=len, reverse=True)
+    return '(%s)' % '|'.join(names)
+
+def _update_months():
+    """
+    Rebuild the lookups and patterns of the month-names after MONTH_NAMES was
+    changed.
+    """
+    global _MONTHS_KEY
+    _MONTH_LOOKUP.clear()
+    _MONTH_LOOKUP.update(_build_month_lookup())
+    _CODE_PATTERNS.update(b=_month_pattern('%b'), B=_month_pattern('%B'))
+    _MATCHERS.clear()
+    _MONTHS_KEY = _months_key()
+    _config_changed()
+
+
+_LEXER = re.compile('(\d+)|([^\W\d_]+)|([\W_]+)', re.U)
+
+def _lex(string):
+    """
+    Split string in a single pass into a list of typed tokens (kind, text):
+    kind is 'd' for a run of digits, 'a' for a run of letters and 's' for a
+    run of separators. The format-classes analyse strings by their tokens and
+    hand slices of them on to each other, so a string is scanned only once.
+    """
+    tokens = list()
+    for digits, letters, seps in _LEXER.findall(string):
+        if digits: tokens.append(('d', digits))
+        elif letters: tokens.append(('a', letters))
+        else: tokens.append(('s', seps))
+    return tokens
+
+
+def _runs(tokens, kinds='da'):
+    """
+    Merge tokens to alternating runs of values (tokens of kinds) and
+    non-values. Return a list of tuples (is_value, text, tokens).
+    """
+    runs = list()
+    last = None
+    for token in tokens:
+        value = token[0] in kinds
+        if value is last:
+            text, merged = runs[-1][1:]
+            runs[-1] = (value, text + token[1], merged + [token])
+        else:
+            runs.append((value, token[1], [token]))
+            last = value
+    return runs
+
+
+def _count_values(tokens):
+    """
+    Count the runs of letters and digits within tokens.
+    """
+    count, sep = 0, True
+    for kind, text in tokens:
+        if kind != 's' and sep: count += 1
+        sep = kind == 's'
+    return count
+
+
+def _cut(tokens, index):
+    """
+    Split tokens at the character-index.
+    """
+    head, tail, pos = list(), list(), 0
+    for kind, text in tokens:
+        end = pos + len(text)
+        if end <= index: head.append((kind, text))
+        elif pos >= index: tail.append((kind, text))
+        else:
+            head.append((kind, text[:index - pos]))
+            tail.append((kind, text[index - pos:]))
+        pos = end
+    return head, tail
+
+
+_CODE_PATTERNS = {
+    'd': r'(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    'm': r'(1[0-2]|0[1-9]|[1-9])',
+    'y': r'(\d\d)',
+    'Y': r'(\d\d\d\d)',
+    'H': r'(2[0-3]|[0-1]\d|\d)',
+    'M': r'([0-5]\d|\d)',
+    'S': r'(6[0-1]|[0-5]\d|\d)',
+    'f': r'([0-9]{1,6})',
+    'b': _month_pattern('%b'),
+    'B': _month_pattern('%B'),
+    '%': '%',
+    }
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
+def _days_from_civil(year, month, day):
+    """
+    Days since 1970-01-01 (proleptic gregorian calendar).
+    """
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+_FIELDS = dict(Y=0, y=0, m=1, b=1, B=1, d=2, H=3, M=4, S=5, f=6)
+"""Position of the value of a format-code within the fields-tuple."""
+
+def _convert(code, value):
+    """
+    Convert the string matched by a format-code to its int-value.
+    """
+    if code == 'y':
+        year = int(value)
+        return year + 2000 if year <= 68 else year + 1900
+    elif code in 'bB': return _MONTH_LOOKUP['%' + code][value.lower()]
+    elif code == 'f': return int(value + '0' * (6 - len(value)))
+    else: return int(value)
+
+
+class _Matcher(object):
+    """
+    A format-string compiled to a regular expression, that matches strings the
+    same way :meth:`datetime.datetime.strptime` does, but returns plain fields.
+    """
+    __slots__ = ('format', 'has_year', 'has_month', '_regex', '_codes')
+
+    def __init__(self, fmt):
+        self.format = fmt
+        self.has_year = '%y' in fmt.lower()
+        self.has_month = '%m' in fmt or '%b' in fmt.lower()
+        pattern = list()
+        self._codes = list()
+        for i, part in enumerate(re.split('(%.)', fmt)):
+            if i % 2:
+                try: pattern.append(_CODE_PATTERNS[part[1]])
+                except KeyError: raise ValueError("'%s' is a bad directive" % part)
+                if part != '%%': self._codes.append(part[1])
+            else:
+                pattern.append(re.sub('\\\\\s+', r'\s+', re.escape(part)))
+        self._regex = re.compile(''.join(pattern), re.IGNORECASE | re.U)
+
+    def match(self, string):
+        """
+        Return a tuple (year, month, day, hour, minute, second, microsecond) or
+        None if string doesn't match. Missing fields default to 1900-01-01 00:00.
+        """
+        found = self.search(string)
+        if found is None: return None
+        return self.fields([_convert(c, v) for c, v in zip(self._codes, found.groups())])
+
+    def search(self, string):
+        """
+        Return the match-object if the whole string matches else None.
+        """
+        found = self._regex.match(string)
+        if not found or found.end() != len(string): return None
+        return found
+
+    def fields(self, values):
+        """
+        Return the fields-tuple for the int-values of the format-codes or None
+        if they don't make a valid date.
+        """
+        fields = [1900, 1, 1, 0, 0, 0, 0]
+        for code, value in zip(self._codes, values):
+            fields[_FIELDS[code]] = value
+        if fields[5] > 59 or fields[2] > _days_in_month(fields[0], fields[1]):
+            return None
+        return tuple(fields)
+
+    def complete(self, fields, today):
+        """
+        Complete fields by the year and month of today if the format lacks them.
+        """
+        if self.has_year and self.has_month: return fields
+        year = fields[0] if self.has_year else today.year
+        month = fields[1] if self.has_month else today.month
+        if fields[2] > _days_in_month(year, month):
+            raise ValueError('day is out of range for month')
+        return (year, month) + fields[2:]
+
+
+_MATCHERS = dict()
+_MATCHERS_MAX = 10000
+
+def _matcher(fmt):
+    """
+    Return the cached :class:`_Matcher` for fmt.
+    """
+    try: return _MATCHERS[fmt]
+    except KeyError: pass
+    if len(_MATCHERS) >= _MATCHERS_MAX: _MATCHERS.clear()
+    matcher = _MATCHERS[fmt] = _Matcher(fmt)
+    return matcher
+
+
+OUTPUTS = ('object', 'fields', 'epoch')
+"""
+Output-modes of the `parser-functions`_:
+
+    * 'object': objects of :mod:`datetime` (default)
+    * 'fields': tuples of ints; (hour, minute, second, microsecond) for times,
+      (year, month, day) for dates and (year, month, day, hour, minute,
+      second, microsecond) for datetimes
+    * 'epoch': microseconds since midnight for times and since 1970-01-01 for
+      dates and datetimes as int
+
+The modes 'fields' and 'epoch' don't create any :mod:`datetime`-objects.
+"""
+
+def _output(fields, kind, output):
+    if output == 'fields':
+        if kind == 'time': return fields[3:]
+        elif kind == 'date': return fields[:3]
+        else: return fields
+    elif output == 'epoch':
+        year, month, day, hour, minute, second, micro = fields
+        if kind == 'time': days = 0
+        else: days = _days_from_civil(year, month, day)
+        if kind == 'date': return days * 86400000000
+        return (((days * 24 + hour) * 60 + minute) * 60 + second) * 1000000 + micro
+    raise ValueError("'%s' is an invalid output-mode" % output)
+
+
+def _civil_from_days(days):
+    """
+    Inverse of :func:`_days_from_civil`.
+    """
+    days += 719468
+    era = days // 146097
+    doe = days - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+_EPOCH = re.compile(r'\s*(?:(\d{9,10})(?:\.(\d{1,6}))?|(\d{12,13})|(\d{15,16}))\s*$')
+
+def _parse_epoch(string, output):
+    """
+    Parse unix-timestamps in seconds (9 or 10 digits, optional with a
+    fraction), milliseconds (12 or 13 digits) or microseconds (15 or 16
+    digits) within :attr:`DatetimeFormats.EPOCH_RANGE`. Return None for any
+    other string.
+    """
+    found = _EPOCH.match(string)
+    if not found: return None
+    seconds, fraction, millis, micros = found.groups()
+    if seconds:
+        micro = int(seconds) * 1000000
+        if fraction: micro += int(fraction + '0' * (6 - len(fraction)))
+    elif millis: micro = int(millis) * 1000
+    else: micro = int(micros)
+    first, last = DatetimeFormats.EPOCH_RANGE
+    days = micro // 86400000000
+    if not _days_from_civil(first, 1, 1) <= days < _days_from_civil(last + 1, 1, 1):
+        return None
+    if output == 'epoch': return micro
+    fields = _fields_from_epoch(micro)
+    if output == 'fields': return fields
+    return datetime.datetime(*fields)
+
+
+def _fields_from_epoch(micro):
+    days, micro = divmod(micro, 86400000000)
+    seconds, micro = divmod(micro, 1000000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return _civil_from_days(days) + (hour, minute, second, micro)
+
+
+class FixedOffset(datetime.tzinfo):
+    """
+    A :class:`datetime.tzinfo` with a fixed offset from UTC.
+
+    :arg int minutes:   Offset in minutes east of UTC.
+
+    The parsers attach it to times and datetimes with a trailing offset (s.
+    :attr:`DatetimeFormats.ALLOW_OFFSET`). Instances are shared per offset.
+    """
+    _instances = dict()
+
+    def __new__(cls, minutes):
+        try: return cls._instances[minutes]
+        except KeyError: pass
+        self = cls._instances[minutes] = super(FixedOffset, cls).__new__(cls)
+        self.minutes = minutes
+        self._offset = datetime.timedelta(minutes=minutes)
+        if not minutes: self._name = 'UTC'
+        else: self._name = '%s%02d:%02d' % (
+            '-' if minutes < 0 else '+', abs(minutes) // 60, abs(minutes) % 60)
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (self.minutes,))
+
+    def __repr__(self):
+        return '%s(%d)' % (self.__class__.__name__, self.minutes)
+
+    def utcoffset(self, dt): return self._offset
+    def dst(self, dt): return datetime.timedelta(0)
+    def tzname(self, dt): return self._name
+
+
+UTC = FixedOffset(0)
+"""The :class:`FixedOffset` of UTC."""
+
+_OFFSET = re.compile(r'(?<=[\d\s])\s*(?:(z|utc|gmt)|([+-])(\d\d):?(\d\d))$', re.I)
+
+def _split_offset(string):
+    """
+    Split a trailing utc-offset ('Z', 'UTC', '+0200', '+02:00') from string.
+    Return the remaining string and a :class:`FixedOffset` or None.
+    """
+    found = _OFFSET.search(string)
+    if not found or not found.start(): return string, None
+    name, sign, hours, minutes = found.groups()
+    if name: return string[:found.start()], UTC
+    hours, minutes = int(hours), int(minutes)
+    if hours > 14 or minutes > 59: return string, None
+    minutes = hours * 60 + minutes
+    return string[:found.start()], FixedOffset(-minutes if sign == '-' else minutes)
+
+
+def _apply_offset(result, offset, kind, output):
+    """
+    Attach offset to the (result, format)-tuple of a parser. Results in the
+    output-modes 'fields' and 'epoch' are normalized to UTC instead.
+    """
+    value, fmt = result
+    if output == 'object': return value.replace(tzinfo=offset), fmt
+    if output == 'fields':
+        fields = value if kind == 'datetime' else (1970, 1, 1) + value
+        value = _output(fields, kind, 'epoch')
+    value -= offset.minutes * 60000000
+    if kind == 'time': value %= 86400000000
+    if output == 'epoch': return value, fmt
+    fields = _fields_from_epoch(value)
+    return (fields[3:] if kind == 'time' else fields), fmt
+
+
+def _to_object(fields, kind):
+    if kind == 'time': return datetime.time(*fields[3:])
+    elif kind == 'date': return datetime.date(*fields[:3])
+    else: return datetime.datetime(*fields)
+
+
+def _parse_fields(string, formats, today, kind, output, learn=False):
+    """
+    Parse string to fields using :class:`_Matcher` and return them in the
+    output-mode together with the matching format. Formats that don't match
+    are skipped without raising any exception. With learn the first format is
+    learned by LEARNED if it matches.
+    """
+    for i, f in enumerate(_attempts(string, formats)):
+        matcher = _compile(f)
+        fields = matcher.match(string)
+        if fields is None: continue
+        if kind != 'time': fields = matcher.complete(fields, today)
+        if learn and not i: LEARNED.learn(kind, string, f)
+        if output == 'object': return _to_object(fields, kind), f
+        return _output(fields, kind, output), f
+    raise ValueError("couldn't parse '%s' as %s" % (string, kind))
+
+
+class _StrptimeMatcher(_Matcher):
+    """
+    A :class:`_Matcher` for formats with directives only strptime knows (like
+    '%j' or '%p').
+    """
+    __slots__ = ()
+
+    def __init__(self, fmt):
+        self.format = fmt
+        self.has_year = '%y' in fmt.lower()
+        self.has_month = '%m' in fmt or '%b' in fmt.lower()
+
+    def match(self, string):
+        try: dtime = datetime.datetime.strptime(string, self.format)
+        except ValueError: return None
+        return (dtime.year, dtime.month, dtime.day, dtime.hour, dtime.minute,
+            dtime.second, dtime.microsecond)
+
+
+def _compile(fmt):
+    """
+    Return the cached :class:`_Matcher` or :class:`_StrptimeMatcher` for fmt.
+    """
+    try: return _MATCHERS[fmt]
+    except KeyError: pass
+    try: return _matcher(fmt)
+    except ValueError: pass
+    matcher = _MATCHERS[fmt] = _StrptimeMatcher(fmt)
+    return matcher
+
+
+class CompiledFormats(tuple):
+    """
+    An immutable sequence of formats, that are compiled once to be passed as
+    *formats* to the `parser-functions`_ again and again.
+
+    :arg formats:       Sequence of format-strings.
+
+    The parser-functions try compiled formats with their own regular
+    expressions instead of :meth:`datetime.datetime.strptime` and know in
+    advance which fields they have to complete by *today*:
+
+        >>> FORMATS = CompiledFormats(['%Y-%m-%d', '%d.%m.%Y'])
+        >>> parsedate('24.04.2013', FORMATS)
+        datetime.date(2013, 4, 24)
+
+    Formats with directives the format-classes don't use (like '%j' or '%p')
+    are still tried with strptime.
+    """
+    def __new__(cls, formats):
+        self = super(CompiledFormats, cls).__new__(cls, formats)
+        self._matchers = tuple(_compile(f) for f in self)
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (tuple(self),))
+
+    def parse(self, string, kind, today=None, output='object', with_format=False):
+        """
+        Parse string with the first fitting format.
+
+        :arg str string:        String to be parsed.
+        :arg str kind:          'time', 'date' or 'datetime'
+        :keyword today:         Optional date to complete incomplete dates.
+        :keyword str output:    Output-mode (s. :data:`OUTPUTS`).
+        :keyword bool with_format:  Return a tuple (result, format).
+
+        :raises:                ValueError, if string couldn't been parsed
+        """
+        for matcher in _attempts(string, self._matchers):
+            fields = matcher.match(string)
+            if fields is None: continue
+            if kind != 'time': fields = matcher.complete(fields, today or TODAY)
+            if output == 'object': result = _to_object(fields, kind)
+            else: result = _output(fields, kind, output)
+            return (result, matcher.format) if with_format else result
+        raise ValueError("couldn't parse '%s' as %s" % (string, kind))
+
+
+_SFORMATS = dict()
+
+def _expand(table):
+    """
+    Expand a table of special formats (each row a sequence of alternatives per
+    position) to a tuple of format-strings. Tuple-tables are expanded once.
+    """
+    try: return _SFORMATS[table]
+    except KeyError: cache = True
+    except TypeError: cache = False
+    formats = tuple(''.join(codes)
+        for row in table for codes in itertools.product(*row))
+    if cache: _SFORMATS[table] = formats
+    return formats
+
+
+class _Configured(type):
+    """
+    Metaclass of the format-classes: setting a class-attribute (as
+    :meth:`BaseFormats.config` does) invalidates the cached configuration.
+    """
+    def __setattr__(cls, name, value):
+        type.__setattr__(cls, name, value)
+        _config_changed()
+
 
 class BaseFormats(list):
     """
@@ -258,6 +999,7 @@ class BaseFormats(list):
                                 * figures[0]: allows a one-digit format ('%H')
                                 * figures[1]: allows two-digit-fmts (e.g. '%H:%M')
                                 * figures[2]: allows three-digit-fmts (e.g. '%H:%M:%S')
+    :keyword tokens:            Tokens of *string* from a previous lexer-pass.
 
     :type seps:                 list
     :type allow_no_sep:         bool
@@ -266,6 +1008,8 @@ class BaseFormats(list):
     :raises:                    ValueError if no format could be produced for
                                 *string*.
     """
+    __metaclass__ = _Configured
+
     ALLOW_NO_SEP = True
     """Allows formats without any separator ('%H%M%S')."""
     FIGURES = [True, True, True]
@@ -280,19 +1024,29 @@ class BaseFormats(list):
     SFORMATS = list()
     ERR_MSG = "no proper format for '%s'"
 
+    __slots__ = ('_figures', '_seps', '_allow_no_sep', '_use_formats',
+        '_use_sformats', '_try_hard', '_sformats', '_alternation', '_values',
+        '_nonvalues', '_tokens')
+
+    _SCRATCH = ('_sformats', '_alternation', '_values', '_nonvalues', '_tokens')
+    """Attributes only needed while the formats are produced."""
+
     USE_FORMATS = True
     USE_SFORMATS = True
 
     TRY_HARD = False
     """
     Regardless of any configuration try hard to build formats for the given string.
+    (The `parser-functions`_ otherwise reject strings at once, whose separators,
+    letters or count of values don't fit any format of the configuration.)
     """
 
     @staticmethod
     def isnone(v): return type(v) == type(None)
 
     def __init__(self, string=None, seps=None, allow_no_sep=None, figures=None,\
-                            try_hard=None, use_formats=None, use_sformats=None):
+                            try_hard=None, use_formats=None, use_sformats=None,
+                            tokens=None):
         super(BaseFormats, self).__init__()
 
         self._figures = figures or self.FIGURES[:]
@@ -311,13 +1065,33 @@ class BaseFormats(list):
 
         self._check_config()
 
-        if string and self._try_hard:
-            self._set_any_formats_for_string(string)
-        elif string:
-            self._set_allowed_formats_for_string(string)
+        if string:
+            BUDGET.check_length(string)
+            self._tokens = _lex(string) if tokens is None else tokens
+            started = BUDGET.start()
+            try:
+                if self._try_hard: self._set_any_formats_for_string(string)
+                else: self._set_allowed_formats_for_string(string)
+            finally:
+                if started: BUDGET.stop()
         else:
             self._set_all(string)
 
+        for attr in self._SCRATCH:
+            try: delattr(self, attr)
+            except AttributeError: pass
+
+    def __getstate__(self):
+        # slots aren't pickled by default; the formats are pickled as list-items
+        state = dict()
+        for cls in type(self).__mro__:
+            for attr in getattr(cls, '__slots__', ()):
+                if hasattr(self, attr): state[attr] = getattr(self, attr)
+        return state
+
+    def __setstate__(self, state):
+        for attr, value in state.items(): setattr(self, attr, value)
+
     def _check_config(self):
         if not self._use_formats and not self._use_sformats:
              raise Exception('invalid configuration')
@@ -340,6 +1114,9 @@ class BaseFormats(list):
         :type seps:                 list
         :type allow_no_sep:         bool
         :type figures:              list
+
+        Assign new lists instead of changing the class-attributes in place;
+        the caches only notice assignments.
         """
         #TODO: overwork the concept of config: use **kwargs and check the dict
         if seps: cls.SEPS = seps
@@ -350,11 +1127,12 @@ class BaseFormats(list):
         if figures: cls.FIGURES = figures
         if not any(cls.FIGURES): raise Exception('invalid configuration')
 
-    def _eval_ingredients(self, string):
+    def _eval_ingredients(self, string, kinds='da'):
 
-        self._alternation = re.findall('[^\W_]+|[\W_]+', string)
-        self._values = re.findall('[^\W_]+', string)
-        self._nonvalues = re.findall('[\W_]+', string)
+        runs = _runs(self._tokens, kinds)
+        self._alternation = [text for value, text, tokens in runs]
+        self._values = [text for value, text, tokens in runs if value]
+        self._nonvalues = [text for value, text, tokens in runs if not value]
 
     def _eval_figures(self):
         """
@@ -381,21 +1159,7 @@ class BaseFormats(list):
         """
 
     def _get_sformats(self):
-        #TODO: rework this...
-        formats = list()
-        for l in self._sformats:
-            l += [[str()] for x in range(7 - len(l))]
-            formats.extend([
-                a+b+c+d+e+f+g
-                for a in l[0]
-                for b in l[1]
-                for c in l[2]
-                for d in l[3]
-                for e in l[4]
-                for f in l[5]
-                for g in l[6]
-                ])
-        return formats
+        return _expand(self._sformats)
 
     def _get_formats(self):
         code_list = self._get_code_list()
@@ -412,6 +1176,31 @@ class BaseFormats(list):
         if self._use_sformats: formats.extend(self._get_sformats())
         return [f for i, f in enumerate(formats) if not f in formats[:i]]
 
+    def _table_key(self):
+        """
+        Key for the table of all formats of the instance's actual configuration.
+        """
+        return (
+            self.__class__.__name__,
+            tuple(self._seps),
+            self._allow_no_sep,
+            tuple(self._figures),
+            self._use_formats,
+            self._use_sformats,
+            )
+
+    def _get_table(self):
+        """
+        Return all formats for the actual configuration as a tuple.
+        Tables are generated once and kept in :data:`_TABLES`. Their format-
+        strings are interned, so all lists share the same string-objects.
+        """
+        key = self._table_key()
+        try: return _TABLES[key]
+        except KeyError: pass
+        table = _TABLES[key] = tuple(_intern(f) for f in self._get_all())
+        return table
+
     def _analyse(self, string):
 
         self._eval_ingredients(string)
@@ -431,12 +1220,12 @@ class BaseFormats(list):
 
         #don't use set to keep the order
         str_fmts = self._get_formats_for_string()
-        all_fmts = self._get_all()
-        self.extend([f for f in str_fmts if f in all_fmts])
+        all_fmts = self._get_table()
+        self.extend([_intern(f) for f in str_fmts if f in all_fmts])
 
     def _set_all(self, string):
 
-        self.extend(self._get_all())
+        self.extend(self._get_table())
 
 
 
@@ -475,22 +1264,47 @@ class TimeFormats(BaseFormats):
     * figures[2]: Allows three-digit-formats like '%H:%M:%S'.
     * figures[3]: Allows four-digit-formats like '%H:%M:%S.%f'.
     """
-    SFORMATS = [
-        [['%H'], [':'], ['%M'], [':'], ['%S'], ['h', ' h']],
-        [['%H'], [':', ''], ['%M'], ['h', ' h']],
-        [['%H'], ['h', ' h']],
-        ]
-    MFORMATS = [
-        [['%H'], [':'], ['%M'], [':'], ['%S'], ['.'], ['%f']],
-        [['%H'], [''], ['%M'], [''], ['%S'], ['.'], ['%f']],
-        ]
+    SFORMATS = (
+        (('%H',), (':',), ('%M',), (':',), ('%S',), ('h', ' h')),
+        (('%H',), (':', ''), ('%M',), ('h', ' h')),
+        (('%H',), ('h', ' h')),
+        )
+    MFORMATS = (
+        (('%H',), (':',), ('%M',), (':',), ('%S',), ('.',), ('%f',)),
+        (('%H',), ('',), ('%M',), ('',), ('%S',), ('.',), ('%f',)),
+        )
+    ALLOW_OFFSET = False
+    """
+    Let :func:`parsetime` accept a trailing utc-offset ('Z', 'UTC', '+0200',
+    '+02:00') and return aware times.
+    """
 
+    __slots__ = ()
 
-    def _eval_ingredients(self, string):
+    @classmethod
+    def config(cls, *args, **kwargs):
+        """
+        Modify class-configuration.
+
+        :keyword seps:              Allowed separators for formats.
+        :keyword allow_no_sep:      Allows formats without any separator.
+        :keyword figures:           List of four booleans (s. :attr:`FIGURES`).
+        :keyword allow_offset:      Let :func:`parsetime` accept utc-offsets.
+        :keyword try_hard:          Regardless of any configuration try hard to
+                                    build formats for the given string.
+
+        :type seps:                 list
+        :type allow_no_sep:         bool
+        :type figures:              list
+        :type allow_offset:         bool
+        """
+        allow_offset = kwargs.pop('allow_offset', None)
+        if not cls.isnone(allow_offset): cls.ALLOW_OFFSET = allow_offset
+        super(TimeFormats, cls).config(*args, **kwargs)
 
-        self._values = re.findall('[\d]+', string)
-        self._nonvalues = re.findall('[\D]+', string)
-        self._alternation = re.findall('[\d]+|[\D]+', string)
+
+    def _eval_ingredients(self, string):
+        super(TimeFormats, self)._eval_ingredients(string, 'd')
 
     def _eval_figures(self):
 
@@ -535,8 +1349,9 @@ class TimeFormats(BaseFormats):
         return code_list
 
     def _get_sformats(self):
-        if self._figures[3]: self._sformats += self.MFORMATS
-        return super(TimeFormats, self)._get_sformats()
+        formats = _expand(self._sformats)
+        if self._figures[3]: formats += _expand(self.MFORMATS)
+        return formats
 
 
 class DateFormats(BaseFormats):
@@ -583,23 +1398,26 @@ class DateFormats(BaseFormats):
     YEAR_CODE = [True, True]
 
     SFORMATS_OPTIONS = {
-        'little' : [
-            [['%d'], ['.', '. '], ['%m', '%b'], ['.']],
-            [['%d'], ['.'], ['%m', '%b'], ['. '], ['%y', '%Y']],
-            [['%d'], ['.', '. '], ['%b', '%B'], [' '], ['%y', '%Y']],
-            ],
-        'big' : [
-            [['%m', '%b'], ['.', '. '], ['%d'], ['.']],
-            [['%b', '%B'], [' '], ['%d'], ['.']],
-            [['%y', '%Y'], [' '], ['%m', '%b'], ['.', '. '], ['%d'], ['.']],
-            [['%y', '%Y'], [' '], ['%b', '%B'], [' '], ['%d'], ['.']],
-            ],
-        'middle' : [
-            ]
+        'little' : (
+            (('%d',), ('.', '. '), ('%m', '%b'), ('.',)),
+            (('%d',), ('.',), ('%m', '%b'), ('. ',), ('%y', '%Y')),
+            (('%d',), ('.', '. '), ('%b', '%B'), (' ',), ('%y', '%Y')),
+            ),
+        'big' : (
+            (('%m', '%b'), ('.', '. '), ('%d',), ('.',)),
+            (('%b', '%B'), (' ',), ('%d',), ('.',)),
+            (('%y', '%Y'), (' ',), ('%m', '%b'), ('.', '. '), ('%d',), ('.',)),
+            (('%y', '%Y'), (' ',), ('%b', '%B'), (' ',), ('%d',), ('.',)),
+            ),
+        'middle' : (
+            ),
         }
 
+    # sformats depend on the actual endian (s. _get_sformats)
     SFORMATS = list()
 
+    __slots__ = ('_month_code', '_year_code')
+
     def __init__(self, *args, **kwargs):
 
         allow_month_name = kwargs.pop('allow_month_name', None)
@@ -608,7 +1426,6 @@ class DateFormats(BaseFormats):
         elif not allow_month_name: self._month_code = [True, False, False]
 
         self._year_code = self.YEAR_CODE
-        self.SFORMATS = self.SFORMATS_OPTIONS[ENDIAN._key]
 
         super(DateFormats, self).__init__(*args, **kwargs)
 
@@ -642,6 +1459,16 @@ class DateFormats(BaseFormats):
         for c in [self._month_code, self._year_code, self._figures]:
             if not any(c): raise Exception('invalid configuration')
 
+    def _get_sformats(self):
+        return _expand(self.SFORMATS_OPTIONS[ENDIAN._key])
+
+    def _table_key(self):
+        return super(DateFormats, self)._table_key() + (
+            tuple(self._month_code),
+            tuple(self._year_code),
+            ENDIAN._key,
+            )
+
     def _analyse(self, string):
 
         self._eval_ingredients(string)
@@ -653,12 +1480,15 @@ class DateFormats(BaseFormats):
 
         mmask = lambda m: map(lambda x,y: y if x else x, self._month_code, m)
 
-        if re.search('(?<![a-zA-Z])[a-zA-Z]{3}(?![a-zA-Z])', string):
-            self._month_code = mmask([False, True, False])
-        elif re.search('(?<![a-zA-Z])[a-zA-Z]{4,9}(?![a-zA-Z])', string):
-            self._month_code = mmask([False, False, True])
-        elif not re.search('[a-zA-Z]+', string):
+        words = [text.lower() for kind, text in self._tokens if kind == 'a']
+        if not words:
             self._month_code = mmask([True, False, False])
+        elif len(words) == 1 and any(words[0] in _MONTH_LOOKUP[c] for c in ('%b', '%B')):
+            self._month_code = mmask([
+                False,
+                words[0] in _MONTH_LOOKUP['%b'],
+                words[0] in _MONTH_LOOKUP['%B'],
+                ])
         else: self._figures = [False, False, False]
 
     def _eval_figures(self):
@@ -743,6 +1573,72 @@ class DateFormats(BaseFormats):
         super(DateFormats, self)._set_any_formats_for_string(string)
 
 
+class FormatProduct(collections.Sequence):
+    """
+    A read-only sequence of all combinations of date- and time-formats.
+
+    :arg list parts:    List of tuples (sep, first-formats, second-formats).
+
+    Its length is computed arithmetically, indexing picks the parts and a
+    membership-test decomposes the format into a first-, a sep- and a
+    second-part. The formats are produced once on the first iteration and
+    shared by all lists filled from the product:
+
+        >>> product = FormatProduct([(' ', ('%d.%m.%Y',), ('%H:%M', '%H'))])
+        >>> len(product)
+        2
+        >>> list(product)
+        ['%d.%m.%Y %H:%M', '%d.%m.%Y %H']
+        >>> '%d.%m.%Y %H' in product
+        True
+    """
+    def __init__(self, parts):
+        self._parts = tuple((s, tuple(d), tuple(t)) for s, d, t in parts)
+        self._sets = None
+        self._formats = None
+
+    def __len__(self):
+        return sum(len(d) * len(t) for s, d, t in self._parts)
+
+    def __iter__(self):
+        if self._formats is None:
+            self._formats = tuple(_intern(d + s + t) for s, dates, times in self._parts
+                for d in dates for t in times)
+        return iter(self._formats)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if index < 0: raise IndexError('index out of range')
+        for s, dates, times in self._parts:
+            size = len(dates) * len(times)
+            if index < size:
+                d, t = divmod(index, len(times))
+                return dates[d] + s + times[t]
+            index -= size
+        raise IndexError('index out of range')
+
+    def __contains__(self, fmt):
+        if self._sets is None:
+            self._sets = [(s, frozenset(d), frozenset(t)) for s, d, t in self._parts]
+        for s, dates, times in self._sets:
+            i = 0
+            while True:
+                i = fmt.find(s, i + 1)
+                if i <= 0: break
+                if fmt[:i] in dates and fmt[i+len(s):] in times: return True
+        return False
+
+    def __getstate__(self):
+        return self._parts
+
+    def __setstate__(self, state):
+        self._parts = state
+        self._sets = None
+        self._formats = None
+
+
 class DatetimeFormats(BaseFormats):
     """
     A list of datetime-string-formats that generates himself.
@@ -752,6 +1648,7 @@ class DatetimeFormats(BaseFormats):
     :keyword allow_no_sep:      Allows formats without any separator.
     :keyword date_config:       kwargs :class:`DateFormats` are initialized with
     :keyword time_config:       kwargs :class:`TimeFormats` are initialized with
+    :keyword allow_time_first:  Allows formats with the time before the date.
     :keyword try_hard:          Regardless of any configuration try hard to
                                 build formats for the given string.
 
@@ -760,18 +1657,49 @@ class DatetimeFormats(BaseFormats):
     :type allow_no_sep:         bool
     :type date_config:          dict
     :type time_config:          dict
+    :type allow_time_first:     bool
 
     :raises:                    ValueError if no format could be produced for
                                 *string*.
+
+    Without *string* the list is filled from a :class:`FormatProduct`, that is
+    built once per configuration and kept in :data:`_TABLES`; the lists share
+    its format-strings. To look at all formats without a list of its own use
+    :meth:`product`.
     """
     SEPS = [' ', ',', '_', ';']
     """A list of separators, formats are produced with."""
     ALLOW_NO_SEP = True
     """Allows formats without any separator ('%H%M%S')."""
+    ALLOW_TIME_FIRST = False
+    """Allows formats with the time before the date ('%H:%M %d.%m.%Y')."""
+    ALLOW_EPOCH = False
+    """
+    Let :func:`parsedatetime` accept unix-timestamps ('1366843445').
+    """
+    EPOCH_RANGE = (1980, 2100)
+    """
+    First and last year of the unix-timestamps :func:`parsedatetime` accepts.
+    Strings of digits out of this range are tried with the formats instead;
+    so '201304242344' isn't taken for milliseconds in 1976.
+    """
+    ALLOW_OFFSET = False
+    """
+    Let :func:`parsedatetime` accept a trailing utc-offset ('Z', 'UTC', '+0200',
+    '+02:00') and return aware datetimes. The offset is split off by a
+    tokenizer of its own, so it doesn't multiply the formats to be tried.
+    """
+
+    __slots__ = ('_date_config', '_time_config', '_pairs', '_allow_time_first')
+
+    _SCRATCH = BaseFormats._SCRATCH + ('_pairs',)
 
     def __init__(self, *args, **kwargs):
         date_config = kwargs.pop('date_config', dict())
         time_config = kwargs.pop('time_config', dict())
+        allow_time_first = kwargs.pop('allow_time_first', None)
+        if self.isnone(allow_time_first): self._allow_time_first = self.ALLOW_TIME_FIRST
+        else: self._allow_time_first = allow_time_first
         self._date_config = dict(
             seps = DateFormats.SEPS,
             allow_no_sep = DateFormats.ALLOW_NO_SEP,
@@ -796,6 +1724,13 @@ class DatetimeFormats(BaseFormats):
         :keyword allow_no_sep:      Allows formats without any separator.
         :keyword date_config:       kwargs :class:`DateFormats` are initialized with
         :keyword time_config:       kwargs :class:`TimeFormats` are initialized with
+        :keyword allow_time_first:  Allows formats with the time before the date.
+        :keyword allow_epoch:       Let :func:`parsedatetime` accept
+                                    unix-timestamps.
+        :keyword epoch_range:       First and last year of the accepted
+                                    unix-timestamps.
+        :keyword allow_offset:      Let :func:`parsedatetime` accept
+                                    utc-offsets.
         :keyword try_hard:          Regardless of any configuration try hard to
                                     build formats for the given string.
 
@@ -803,12 +1738,55 @@ class DatetimeFormats(BaseFormats):
         :type allow_no_sep:         bool
         :type date_config:          dict
         :type time_config:          dict
+        :type allow_time_first:     bool
+        :type allow_epoch:          bool
+        :type epoch_range:          tuple
+        :type allow_offset:         bool
         """
+        allow_time_first = kwargs.pop('allow_time_first', None)
+        if not self.isnone(allow_time_first): self.ALLOW_TIME_FIRST = allow_time_first
+        allow_epoch = kwargs.pop('allow_epoch', None)
+        if not self.isnone(allow_epoch): self.ALLOW_EPOCH = allow_epoch
+        epoch_range = kwargs.pop('epoch_range', None)
+        if not self.isnone(epoch_range): self.EPOCH_RANGE = tuple(epoch_range)
+        allow_offset = kwargs.pop('allow_offset', None)
+        if not self.isnone(allow_offset): self.ALLOW_OFFSET = allow_offset
         super(DatetimeFormats, self).config(*args, **kwargs)
 
+    @classmethod
+    def product(cls):
+        """
+        Return the :class:`FormatProduct` of all formats of the actual
+        class-configuration.
+
+        :rtype:                     :class:`FormatProduct`
+
+        The product is built once per configuration and kept in
+        :data:`_TABLES`. Use it instead of ``DatetimeFormats()`` to test or
+        count formats without copying thousands of them into a new list:
+
+            >>> '%d.%m.%Y %H:%M' in DatetimeFormats.product()
+            True
+        """
+        key = (cls.__name__, 'product', _config_state())
+        try: return _TABLES[key]
+        except KeyError: pass
+        product = _TABLES[key] = cls()._get_table()
+        return product
+
     def _check_config(self):
         pass
 
+    def _table_key(self):
+        freeze = lambda d: tuple(sorted(
+            (k, tuple(v) if isinstance(v, list) else v) for k, v in d.items()))
+        return super(DatetimeFormats, self)._table_key() + (
+            freeze(self._date_config),
+            freeze(self._time_config),
+            self._allow_time_first,
+            _config_state(),
+            )
+
     def _analyse(self, string):
 
         self._eval_ingredients(string)
@@ -816,93 +1794,823 @@ class DatetimeFormats(BaseFormats):
 
     def _seperate_string(self, string):
         """
-        Try to reduce the amount of seps for all three format-classes.
-        time-seps and date-seps will be passed to the respective constructor.
+        Find the points to split the string into a date- and a time-part.
+
+        The tokens of both parts are classified (month-names, four-digit-years,
+        ':'-joined values, fractions) to drop impossible splits and to rank the
+        remaining ones, before any format-list is built. Splits of equal rank
+        keep their order from left to right.
         """
 
         self._pairs = list()
         a = self._alternation
 
         if len(self._values) == 1 and self._allow_no_sep:
+            figures = self._time_config['figures']
+            max_time = 12 if len(figures) > 3 and figures[3] else 6
             i = len(string)
             while i > 1:
                 i -= 1
-                self._pairs.append((string[:i], str(), string[i:]))
-
-        elif len(self._values) == 2:
-            i = a.index(self._values[0]) + 1
-            self._pairs.append((''.join(a[:i]), a[i], ''.join(a[i+1:])))
-
-        else:
-            nvl = self._nonvalues[:]
-            nvl.reverse()
+                if string.isdigit() and (i > 8 or len(string) - i > max_time):
+                    continue
+                head, tail = _cut(self._tokens, i)
+                self._pairs.append((string[:i], str(), string[i:], False, head, tail))
+            BUDGET.check_pairs(len(self._pairs), string)
+            return
+
+        runs = [tokens for value, text, tokens in _runs(self._tokens)]
+        orders = (False, True) if self._allow_time_first else (False,)
+        splits = list()
+        for i in range(1, len(a) - 1):
+            if a[i][0].isalnum(): continue
+            first, second = ''.join(a[:i]), ''.join(a[i+1:])
+            head = [token for tokens in runs[:i] for token in tokens]
+            tail = [token for tokens in runs[i+1:] for token in tokens]
+            for time_first in orders:
+                d, t = (tail, head) if time_first else (head, tail)
+                dscore, tscore = self._date_score(d), self._time_score(t)
+                if dscore is None or tscore is None: continue
+                #a time before the date needs to be unambiguous
+                if time_first and not tscore: continue
+                score = dscore + tscore + int(' ' in a[i]) - int(time_first)
+                splits.append((-score, time_first, i,
+                    (first, a[i], second, time_first, head, tail)))
+
+        splits.sort()
+        self._pairs = [s[-1] for s in splits]
+        BUDGET.check_pairs(len(self._pairs), string)
 
-            #prefer space-seperators
-            spl = [nvl.pop(nvl.index(v)) for v in nvl[:] if ' ' in v]
-            for nv in spl:
-                i = a.index(nv)
-                if i == 0 or i == a.index(a[-1]): continue
-                self._pairs.append((''.join(a[:i]), a[i], ''.join(a[i+1:])))
+    @staticmethod
+    def _date_score(tokens):
+        """
+        Rate the tokens of a date-part; None if they could not be a date at all.
+        """
+        values = _count_values(tokens)
+        seps = ''.join(text for kind, text in tokens if kind == 's')
+        if not 1 <= values <= 3 or ':' in seps: return None
+        score = 0
+        words = [text for kind, text in tokens if kind == 'a']
+        if len(words) > 1: return None
+        elif words:
+            if not any(words[0].lower() in _MONTH_LOOKUP[c] for c in ('%b', '%B')):
+                return None
+            score += 1
+        digits = [text for kind, text in tokens if kind == 'd']
+        if values > 1 and any(len(v) not in (1, 2, 4) for v in digits):
+            return None
+        if any(len(v) == 4 for v in digits): score += 1
+        return score
 
-            for nv in nvl:
-                i = a.index(nv)
-                if i == 0 or i == a.index(a[-1]): continue
-                self._pairs.append((''.join(a[:i]), a[i], ''.join(a[i+1:])))
+    @staticmethod
+    def _time_score(tokens):
+        """
+        Rate the tokens of a time-part; None if they could not be a time at all.
+        """
+        if any(text.lower() != 'h' for kind, text in tokens if kind == 'a'):
+            return None
+        digits = [i for i, (kind, text) in enumerate(tokens) if kind == 'd']
+        if not 1 <= len(digits) <= 4: return None
+        if len(digits) > 1:
+            #a fraction is the last run of digits right after a dot
+            last = digits[-1]
+            if last and tokens[last - 1][1].endswith('.'): digits = digits[:-1]
+            if any(len(tokens[i][1]) > 2 for i in digits): return None
+        seps = ''.join(text for kind, text in tokens if kind != 'd')
+        if ':' in seps: return 2
+        elif 'h' in seps.lower(): return 1
+        else: return 0
 
     def _get_formats_for_string(self):
 
         formats = list()
 
-        for d, s, t in self._pairs:
+        string = ''.join(self._alternation)
+        for first, s, second, time_first, head, tail in self._pairs:
+            BUDGET.check_time(string)
+            d, t = (second, first) if time_first else (first, second)
+            dt, tt = (tail, head) if time_first else (head, tail)
             try:
-                #TODO: make the order of date and time configurable
-                df = DateFormats(d)
-                tf = TimeFormats(t)
+                df = DateFormats(d, tokens=dt)
+                tf = TimeFormats(t, tokens=tt)
             except ValueError: continue
             else:
-                fmts = [d + s + t for d in df for t in tf]
+                if time_first: fmts = [t + s + d for d in df for t in tf]
+                else: fmts = [d + s + t for d in df for t in tf]
                 formats.extend(fmts)
+                BUDGET.check_formats(len(formats), string)
 
         #make sure the formats-list is unique (using set would destroy the order)
         return [f for i,f in enumerate(formats) if not f in formats[:i]]
 
+    def _get_table(self):
+        key = self._table_key()
+        try: return _TABLES[key]
+        except KeyError: pass
+        table = _TABLES[key] = self._get_product()
+        return table
+
     def _get_all(self):
+        return list(self._get_product())
+
+    def _get_product(self):
         """
-        Generate datetime-formats by combining date- and time-formats.
+        Combine date- and time-formats to a :class:`FormatProduct`.
         """
-        formats = list()
+        parts = list()
         date_fmt = DateFormats(**self._date_config)
         time_fmt = TimeFormats(**self._time_config)
         for s in self._seps:
-            formats += [s.join((d, t)) for d in date_fmt for t in time_fmt]
+            parts.append((s, date_fmt, time_fmt))
+        if self._allow_time_first:
+            time_first = [(s, time_fmt, date_fmt) for s in self._seps]
+        else: time_first = list()
         if self._allow_no_sep:
             #TODO: warrant that no sformats are included
-            self._date_config['allow_no_sep'] = True
-            self._time_config['allow_no_sep'] = True
-            self._date_config['seps'] = list()
-            self._time_config['seps'] = list()
-            self._date_config['use_sformats'] = False
-            self._time_config['use_sformats'] = False
-            date_fmt = DateFormats(**self._date_config)
-            time_fmt = TimeFormats(**self._time_config)
-            formats += [str().join((d, t)) for d in date_fmt for t in time_fmt]
+            #copies keep the instance's configuration (and its table-key) intact
+            no_sep = dict(allow_no_sep=True, seps=list(), use_sformats=False)
+            date_fmt = DateFormats(**dict(self._date_config, **no_sep))
+            time_fmt = TimeFormats(**dict(self._time_config, **no_sep))
+            parts.append((str(), date_fmt, time_fmt))
 
-        return formats
+        return FormatProduct(parts + time_first)
 
 
 
+_TABLES = dict()
+"""
+Tables of all formats per configuration; filled by the format-classes on
+demand and by :func:`load_formats`.
+"""
 
+_CONFIG_STATE = (None, None)
 
+_CONFIG_ATTRS = dict(
+    TimeFormats = ('ALLOW_OFFSET',),
+    DateFormats = ('MONTH_CODE', 'YEAR_CODE'),
+    DatetimeFormats = ('ALLOW_TIME_FIRST', 'ALLOW_EPOCH', 'EPOCH_RANGE',
+        'ALLOW_OFFSET'),
+    )
+"""Class-attributes of the configuration besides those of :class:`BaseFormats`."""
+
+def _config_state():
+    """
+    Snapshot of the class-level configuration of all format-classes, ENDIAN
+    and MONTH_NAMES as a tuple of (name, value)-pairs; the configuration of a format-class is
+    a tuple of (attribute, value)-pairs itself.
+    It is rebuilt only after the configuration was changed.
+    """
+    global _CONFIG_STATE
+    version = _CONFIG_VERSION[0]
+    if _CONFIG_STATE[0] == version: return _CONFIG_STATE[1]
+    freeze = lambda v: tuple(v) if isinstance(v, list) else v
+    state = list()
+    for cls in (TimeFormats, DateFormats, DatetimeFormats):
+        attrs = ('SEPS', 'ALLOW_NO_SEP', 'FIGURES', 'USE_FORMATS', 'USE_SFORMATS',
+            'TRY_HARD') + _CONFIG_ATTRS[cls.__name__]
+        state.append((cls.__name__, tuple((a, freeze(getattr(cls, a))) for a in attrs)))
+    state.append(('ENDIAN', ENDIAN._key))
+    state.append(('MONTH_NAMES', _MONTHS_KEY))
+    state = tuple(state)
+    _CONFIG_STATE = (version, state)
+    return state
+
+
+def config_hash():
+    """
+    Return a hash of the actual configuration of all format-classes,
+    :data:`ENDIAN` and :data:`MONTH_NAMES`.
+    """
+    return hashlib.md5(repr(_config_state()).encode('ascii')).hexdigest()
 
 
+def save_formats(path):
+    """
+    Write the format-tables of the actual configuration to a cache-file.
 
+    :arg str path:      Path of the cache-file.
 
-def parsetime(string, formats=list()):
+    The tables of :class:`TimeFormats`\ (), :class:`DateFormats`\ () and
+    :class:`DatetimeFormats`\ () are generated if necessary. The file is tagged
+    with the version of timeparser and :func:`config_hash`.
+    """
+    TimeFormats(), DateFormats(), DatetimeFormats()
+    data = dict(
+        version = __version__,
+        config = config_hash(),
+        tables = _TABLES,
+        )
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'wb') as f:
+        pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+    os.rename(tmp, path)
+
+
+def load_formats(path):
+    """
+    Load format-tables from a cache-file written by :func:`save_formats`.
+
+    :arg str path:      Path of the cache-file.
+
+    :rtype:             bool
+
+    Returns False if the file is missing, unreadable or was written by another
+    version of timeparser or for another configuration. In that case the tables
+    are generated on demand as usual:
+
+        >>> save_formats('/tmp/timeparser.cache')
+        >>> load_formats('/tmp/timeparser.cache')
+        True
+        >>> ENDIAN.set('big')
+        >>> load_formats('/tmp/timeparser.cache')
+        False
+
+    The cache-file is unpickled, which could run arbitrary code. Only load
+    files you wrote yourself and keep them where nobody else could write.
+    """
+    try:
+        with open(path, 'rb') as f: data = pickle.load(f)
+    except Exception: return False
+    if not isinstance(data, dict): return False
+    if data.get('version') != __version__: return False
+    if data.get('config') != config_hash(): return False
+    _TABLES.update(data['tables'])
+    return True
+
+
+def warmup(strings=list()):
+    """
+    Build all format-tables, prefilters and matchers for the actual
+    configuration.
+
+    :keyword list strings:  Sample-strings that are parsed with all
+                            `parser-functions`_ to build the tables needed for
+                            strings of the same kind.
+
+    :rtype:                 dict
+
+    Call it in the master-process of a prefork-server (e.g. gunicorn's
+    *on_starting*-hook). The workers then inherit the tables and the first
+    requests don't pay for building them. Returns the number of tables,
+    prefilters and matchers:
+
+        >>> warmup(['24.4.2013', '23:44', '24.4.2013 23:44'])
+        {'matchers': 88, 'prefilters': 3, 'tables': 13}
+    """
+    for fmt in TimeFormats(): _matcher(fmt)
+    for fmt in DateFormats(): _matcher(fmt)
+    for cls in (TimeFormats, DateFormats, DatetimeFormats): _prefilter(cls)
+    for string in strings:
+        for parser in (parsetime, parsedate, parsedatetime):
+            try: parser(string)
+            except ValueError: pass
+    return dict(tables=len(_TABLES), prefilters=len(_PREFILTERS),
+        matchers=len(_MATCHERS))
+
+
+class ResultCache(object):
+    """
+    A bounded cache for the results of the `parser-functions`_.
+
+    The cache is keyed by the string, the arguments of the parser-function, the
+    configuration of the format-classes, :data:`ENDIAN`, the year and month of
+    :data:`TODAY` and the generation of the formats in :data:`LEARNED`. Strings that couldn't be parsed are cached as well, so
+    repeated junk fails fast without trying any format again. (Only
+    :exc:`BudgetExceeded` is never cached.)
+
+    If the cache is full the least recently used entry is dropped. A maxsize of
+    0 (the default) disables the cache.
+    """
+    def __init__(self, maxsize=0):
+        self._lock = threading.Lock()
+        self.set(maxsize)
+
+    def set(self, maxsize=0):
+        """
+        Change the size of the cache and clear it.
+
+        :arg int maxsize:   Maximal number of cached results (0 disables the
+                            cache).
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self._data = collections.OrderedDict()
+            self.hits = self.misses = self.evictions = self.failures = 0
+
+    def clear(self):
+        """
+        Drop all cached results and reset the counters.
+        """
+        self.set(self.maxsize)
+
+    def stats(self):
+        """
+        Return a dict with the size, hits, misses and evictions of the cache.
+        """
+        with self._lock:
+            calls = self.hits + self.misses
+            return dict(
+                maxsize = self.maxsize,
+                size = len(self._data),
+                failures = self.failures,
+                hits = self.hits,
+                misses = self.misses,
+                evictions = self.evictions,
+                hitrate = float(self.hits) / calls if calls else 0.0,
+                )
+
+    def __call__(self, key, func, *args):
+        with self._lock:
+            value = self._data.pop(key, None)
+            if value:
+                self._data[key] = value
+                self.hits += 1
+            else: self.misses += 1
+        if not value:
+            try: value = (True, func(*args))
+            except BudgetExceeded: raise
+            except ValueError as err: value = (False, err)
+            with self._lock:
+                old = self._data.pop(key, None)
+                if old and not old[0]: self.failures -= 1
+                if not value[0]: self.failures += 1
+                self._data[key] = value
+                while len(self._data) > self.maxsize:
+                    if not self._data.popitem(last=False)[1][0]: self.failures -= 1
+                    self.evictions += 1
+        ok, result = value
+        if ok: return result
+        raise result.__class__(*result.args)
+
+
+RESULTS = ResultCache()
+"""
+RESULTS is an instance of :class:`ResultCache`, which is used by the
+`parser-functions`_. It is disabled by default and could be enabled through
+:meth:`ResultCache.set`:
+
+    >>> RESULTS.set(10000)
+    >>> parsedate('bla')
+    ValueError: couldn't parse 'bla' as date
+    >>> parsedate('bla')
+    ValueError: couldn't parse 'bla' as date
+    >>> RESULTS.stats()['hits']
+    1
+"""
+
+
+_SHAPE_DIGIT = re.compile('\d')
+_SHAPE_ALPHA = re.compile('[^\W\d_]', re.U)
+
+def _shape(string):
+    """
+    Skeleton of string: each digit becomes '9' and each letter 'a'.
+    """
+    return _SHAPE_ALPHA.sub('a', _SHAPE_DIGIT.sub('9', string))
+
+
+class FormatStore(object):
+    """
+    A persistent store of learned formats, that could be shared by several
+    processes on the same host.
+
+    Whenever a `parser-function`_ had to search the formats of a format-class
+    for a string and the first format matched, it is learned for the shape of
+    the string (each digit replaced by '9' and each letter by 'a'). The next
+    string of the same shape is tried with the learned format first, without
+    building a format-list at all. Formats that won after others failed are not
+    learned: another string of the same shape could match one of those (e.g.
+    '%d%m' fails for '1331' but parses '2403').
+
+    The store is backed by a sqlite-database and keeps the formats apart per
+    :func:`config_hash`. Formats learned by all processes are read on the first
+    lookup; the own discoveries are merged back every *interval* seconds, on
+    :meth:`sync` and on :meth:`close`. If processes learned different formats
+    for a shape, the one that was learned most often wins.
+
+    A path of None (the default) disables the store. The *generation* of the
+    store is counted up whenever its formats change.
+    """
+    def __init__(self, path=None, interval=60):
+        self._lock = threading.Lock()
+        self.path = None
+        self.generation = 0
+        self.open(path, interval)
+
+    def open(self, path=None, interval=60):
+        """
+        Close the store and reopen it with another database.
+
+        :arg str path:          Path of the sqlite-database (None disables the
+                                store).
+        :arg int interval:      Seconds between two merges with the database.
+        """
+        if path and sqlite3 is None:
+            raise ImportError('FormatStore needs the sqlite3-module')
+        self.close()
+        with self._lock:
+            self.path = path
+            self.interval = interval
+            self._formats = dict()
+            self._pending = dict()
+            self._state = None
+            self._hash = None
+            self._synced = time.time()
+            self.generation += 1
+
+    def close(self):
+        """
+        Merge the learned formats into the database and disable the store.
+        """
+        self.sync()
+        self.path = None
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.text_factory = str
+        db.execute('CREATE TABLE IF NOT EXISTS formats (config TEXT, kind TEXT, '
+            'shape TEXT, format TEXT, hits INTEGER, '
+            'PRIMARY KEY (config, kind, shape, format))')
+        return db
+
+    def _reload(self, state):
+        config = config_hash()
+        db = self._connect()
+        try: rows = db.execute('SELECT kind, shape, format FROM formats '
+            'WHERE config = ? ORDER BY hits', (config,)).fetchall()
+        finally: db.close()
+        with self._lock:
+            self._formats = dict(((k, s), _intern(f)) for k, s, f in rows)
+            self._state = state
+            self._hash = config
+            self.generation += 1
+
+    def sync(self):
+        """
+        Merge the formats learned since the last sync into the database and
+        read the formats learned by other processes.
+        """
+        if not self.path: return
+        with self._lock:
+            pending, self._pending = self._pending, dict()
+            self._synced = time.time()
+            self._state = None
+        if not pending: return
+        db = self._connect()
+        try:
+            with db:
+                for key, hits in pending.items():
+                    db.execute('INSERT OR IGNORE INTO formats VALUES (?, ?, ?, ?, 0)', key)
+                    db.execute('UPDATE formats SET hits = hits + ? WHERE config = ? '
+                        'AND kind = ? AND shape = ? AND format = ?', (hits,) + key)
+        finally: db.close()
+
+    def lookup(self, kind, string):
+        """
+        Return the learned format of kind for the shape of string or None.
+        """
+        if time.time() - self._synced > self.interval: self.sync()
+        state = _config_state()
+        if state != self._state: self._reload(state)
+        return self._formats.get((kind, _shape(string)))
+
+    def learn(self, kind, string, fmt):
+        """
+        Learn fmt as the winning format of kind for the shape of string.
+        """
+        key = (kind, _shape(string))
+        if self._formats.get(key) == fmt: return
+        with self._lock:
+            self._formats[key] = fmt
+            self.generation += 1
+            key = (self._hash,) + key + (fmt,)
+            self._pending[key] = self._pending.get(key, 0) + 1
+
+
+LEARNED = FormatStore()
+"""
+LEARNED is an instance of :class:`FormatStore`, which is used by the
+`parser-functions`_ if they weren't called with formats. It is disabled by
+default and could be enabled through :meth:`FormatStore.open`:
+
+    >>> LEARNED.open('/var/cache/timeparser.db', interval=300)
+    >>> parsedate('24.04.2013')
+    datetime.date(2013, 4, 24)
+    >>> LEARNED.lookup('date', '25.04.2013')
+    '%d.%m.%Y'
+"""
+
+
+def _config_snapshot():
+    """
+    The configuration of the format-classes and ENDIAN (s. :func:`_config_state`)
+    together with TODAY, the languages of MONTH_NAMES, the limits of BUDGET and
+    whether LEARNED is open as a dict, that could be written as json.
+    """
+    snapshot = dict((name, dict(value) if isinstance(value, tuple) else value)
+        for name, value in _config_state())
+    snapshot.update(
+        TODAY = _isodate(TODAY),
+        MONTH_NAMES = sorted(MONTH_NAMES),
+        BUDGET = dict(max_length=BUDGET.max_length, max_formats=BUDGET.max_formats,
+            max_pairs=BUDGET.max_pairs, timeout=BUDGET.timeout),
+        LEARNED = bool(LEARNED.path),
+        )
+    return snapshot
+
+
+def _isodate(date):
+    return '%04d-%02d-%02d' % (date.year, date.month, date.day)
+
+
+class Recorder(object):
+    """
+    An opt-in recorder, that samples the calls of the `parser-functions`_ to a
+    corpus-file. Replay it with :mod:`timeparser_replay` to check a change
+    against real inputs.
+
+    The corpus is written as json-lines: one line per sampled call with its
+    kind, string and the arguments that differ from their defaults. Strings
+    passed to :func:`parse_many`, :class:`StreamParser`, :func:`decode_column`
+    or :mod:`timeparser_server` are sampled one by one and tagged with their
+    source. The configuration of the format-classes, :data:`ENDIAN`,
+    :data:`TODAY`, :data:`BUDGET` and whether :data:`LEARNED` is open is
+    written before the first call and whenever it changed.
+
+    A rate of 0 (the default) disables the recorder.
+    """
+    DEFAULTS = dict(output='object', key='weeks')
+    """Arguments that aren't recorded with these values."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = None
+        self.path = None
+        self.rate = 0
+        self.recorded = 0
+
+    def open(self, path, rate=0.01, seed=None):
+        """
+        Close the recorder and append the sampled calls to path.
+
+        :arg str path:          Path of the corpus-file.
+        :keyword float rate:    Fraction of the calls to be recorded.
+        :keyword seed:          Seed of the sampling.
+        """
+        self.close()
+        with self._lock:
+            self._file = open(path, 'a')
+            self._random = random.Random(seed)
+            self._config = None
+            self.path = path
+            self.recorded = 0
+            self.rate = rate
+
+    def close(self):
+        """
+        Close the corpus-file and disable the recorder.
+        """
+        with self._lock:
+            self.rate = 0
+            if self._file: self._file.close()
+            self._file = self.path = None
+
+    def pause(self):
+        """
+        Stop recording the calls of the actual thread until :meth:`resume`;
+        used by callers, that recorded their strings already.
+        """
+        self._local.paused = getattr(self._local, 'paused', 0) + 1
+
+    def resume(self):
+        self._local.paused -= 1
+
+    def record(self, kind, string, source=None, **kwargs):
+        """
+        Write the call of a parser-function with the probability of rate.
+        """
+        if getattr(self._local, 'paused', 0): return
+        if self._random.random() >= self.rate: return
+        call = dict(kind=kind, string=string)
+        if source: call['source'] = source
+        for key, value in kwargs.items():
+            if value is None or key == 'formats' and not value: continue
+            if self.DEFAULTS.get(key, self) == value: continue
+            if key == 'formats': value = list(value)
+            elif key == 'today': value = _isodate(value)
+            call[key] = value
+        try:
+            config = json.dumps(dict(config=_config_snapshot()))
+            call = json.dumps(call)
+        except (TypeError, ValueError): return
+        with self._lock:
+            if not self._file: return
+            if config != self._config:
+                self._file.write(config + '\n')
+                self._config = config
+            self._file.write(call + '\n')
+            self._file.flush()
+            self.recorded += 1
+
+
+RECORDER = Recorder()
+"""
+RECORDER is an instance of :class:`Recorder`, which is used by the
+`parser-functions`_. It is disabled by default and could be enabled through
+:meth:`Recorder.open`:
+
+    >>> RECORDER.open('/var/tmp/timeparser.jsonl', rate=0.001)
+"""
+
+
+_WIDTHS = dict(d=2, m=2, y=2, Y=4, H=2, M=2, S=2, f=6)
+"""Maximal count of digits matched by the numeric format-codes."""
+
+
+
+class _Prefilter(object):
+    """
+    Cheap checks for strings none of a set of formats could ever parse: The
+    string may hold only the separators and letters of the formats (or
+    month-names), no more value-groups than the formats have fields and no
+    longer runs of digits than the formats could match.
+    """
+    __slots__ = ('chars', 'words', 'runs', 'digits', '_space')
+
+    def __init__(self, formats=()):
+        self.chars, self.words = set(), set()
+        self.runs = self.digits = 0
+        for fmt in formats: self._add(fmt)
+        self._compile()
+
+    def _add(self, fmt):
+        runs = digits = 0
+        in_run = False
+        for i, part in enumerate(re.split('(%.)', fmt)):
+            if i % 2 and part != '%%':
+                code = part[1]
+                if not in_run: runs += 1
+                in_run = True
+                if code in 'bB':
+                    self.words.update(_MONTH_LOOKUP['%' + code])
+                    digits = 0
+                else:
+                    digits += _WIDTHS.get(code, 0)
+                    self.digits = max(self.digits, digits)
+                if code == 'd': self.chars.add(' ')
+                continue
+            for char in part if i % 2 == 0 else '%':
+                if char.isalnum():
+                    if not in_run: runs += 1
+                    in_run = True
+                    if char.isdigit():
+                        digits += 1
+                        self.digits = max(self.digits, digits)
+                    else:
+                        self.words.add(char.lower())
+                        digits = 0
+                else:
+                    self.chars.add(char)
+                    in_run = False
+                    digits = 0
+        self.runs = max(self.runs, runs)
+
+    def _compile(self):
+        self._space = any(c.isspace() for c in self.chars)
+
+    @classmethod
+    def product(cls, parts):
+        """
+        Prefilter of a :class:`FormatProduct` of parts (sep, first, second).
+        """
+        self = cls()
+        for sep, first, second in parts:
+            first, second = cls(first), cls(second)
+            for other in (first, second, cls([sep.replace('%', '%%')])):
+                self.chars |= other.chars
+                self.words |= other.words
+            seps = cls([sep.replace('%', '%%')]).runs
+            self.runs = max(self.runs, first.runs + second.runs + seps)
+            if sep: digits = max(first.digits, second.digits)
+            else: digits = first.digits + second.digits
+            self.digits = max(self.digits, digits)
+        self._compile()
+        return self
+
+    def _word(self, word):
+        """
+        Check if word could be composed of month-names and literal letters.
+        """
+        if word in self.words: return True
+        return any(word[:i] in self.words and self._word(word[i:])
+            for i in range(1, len(word)))
+
+    def _seps(self, seps):
+        """
+        Check if all characters of seps are separators of the formats.
+        """
+        if set(seps) <= self.chars: return True
+        return self._space and all(c in self.chars or c.isspace() for c in seps)
+
+    def rejects(self, string, tokens=None):
+        """
+        Return True if no format could parse string.
+        """
+        if tokens is None: tokens = _lex(string)
+        values = _count_values(tokens)
+        if not values or values > self.runs: return True
+        for kind, text in tokens:
+            if kind == 'd':
+                if len(text) > self.digits: return True
+            elif kind == 'a':
+                if not self._word(text.lower()): return True
+            elif not self._seps(text): return True
+        return False
+
+
+_PREFILTERS = dict()
+
+def _prefilter(cls):
+    """
+    Return the cached :class:`_Prefilter` for the actual configuration of cls
+    or None if the configuration tries hard.
+    """
+    if cls.TRY_HARD: return None
+    if cls is DatetimeFormats and (DateFormats.TRY_HARD or TimeFormats.TRY_HARD):
+        return None
+    key = (cls.__name__, _config_state())
+    try: return _PREFILTERS[key]
+    except KeyError: pass
+    if cls is DatetimeFormats: prefilter = _Prefilter.product(cls.product()._parts)
+    else: prefilter = _Prefilter(cls())
+    _PREFILTERS[key] = prefilter
+    return prefilter
+
+
+def _candidates(cls, string, tokens, learned):
+    """
+    Formats of cls for string with the learned format first.
+    """
+    yield learned
+    for f in cls(string=string, tokens=tokens):
+        if f != learned: yield f
+
+
+def _formats(cls, kind, string, formats):
+    """
+    Return the formats to try for string and whether the winner is to learn.
+    Strings the configuration of cls could never parse are rejected at once.
+    """
+    if formats: return formats, False
+    tokens = _lex(string)
+    prefilter = _prefilter(cls)
+    if prefilter and prefilter.rejects(string, tokens):
+        raise ValueError("couldn't parse '%s' as %s" % (string, kind))
+    if not LEARNED.path: return cls(string=string, tokens=tokens), False
+    learned = LEARNED.lookup(kind, string)
+    if learned is None: return cls(string=string, tokens=tokens), True
+    return _candidates(cls, string, tokens, learned), False
+
+
+def _budgeted(func):
+    """
+    Check the length of the string and run func on the clock of BUDGET.
+    """
+    def budgeted(string, *args):
+        BUDGET.check_length(string)
+        started = BUDGET.start()
+        try: return func(string, *args)
+        finally:
+            if started: BUDGET.stop()
+    budgeted.__name__ = func.__name__
+    budgeted.__doc__ = func.__doc__
+    return budgeted
+
+
+def _attempts(string, formats):
+    """
+    Iterate over formats within the limits of BUDGET.
+    """
+    for i, f in enumerate(formats, 1):
+        BUDGET.check_formats(i, string)
+        BUDGET.check_time(string)
+        yield f
+
+
+def _listed(formats):
+    # an iterator of formats would be consumed by the key of RESULTS
+    return formats if isinstance(formats, (list, tuple)) else list(formats)
+
+
+def parsetime(string, formats=list(), output='object', with_format=False):
     """
     Parse a string to a :class:`datetime.time` -object.
 
     :arg str string:        String to be parsed.
-    :keyword list formats:  Optional list of formats-string.
+    :keyword list formats:  Optional list of formats-string or
+                            :class:`CompiledFormats`.
+    :keyword str output:    Output-mode (s. :data:`OUTPUTS`).
+    :keyword bool with_format:  Return a tuple (result, format).
 
     :rtype:                 :class:`datetime.time`
     :raises:                ValueError, if string couldn't been parsed
@@ -910,21 +2618,43 @@ def parsetime(string, formats=list()):
     The string is tried to be parsed with every format of *formats*.
     If *formats* not given :class:`TimeFormats`\ (string) is used.
     """
-    formats = formats or TimeFormats(string=string)
-    for f in formats:
-        try: return datetime.datetime.strptime(string, f).time()
-        except ValueError: continue
-    raise ValueError("couldn't parse '%s' as time" % string)
-
-
-def parsedate(string, formats=list(), today=None):
+    formats = _listed(formats)
+    if RECORDER.rate: RECORDER.record('time', string, formats=formats, output=output)
+    if not RESULTS.maxsize: result = _parsetime(string, formats, output)
+    else:
+        key = ('time', string, tuple(formats), output, _config_state(),
+            LEARNED.generation)
+        result = RESULTS(key, _parsetime, string, formats, output)
+    return result if with_format else result[0]
+
+
+@_budgeted
+def _parsetime(string, formats, output):
+    if TimeFormats.ALLOW_OFFSET:
+        rest, offset = _split_offset(string)
+        if offset is not None:
+            try: return _apply_offset(_parsetime(rest, formats, output),
+                offset, 'time', output)
+            except BudgetExceeded: raise
+            except ValueError: pass
+    if isinstance(formats, CompiledFormats):
+        return formats.parse(string, 'time', None, output, True)
+    formats, learn = _formats(TimeFormats, 'time', string, formats)
+    return _parse_fields(string, formats, None, 'time', output, learn)
+
+
+def parsedate(string, formats=list(), today=None, output='object',
+              with_format=False):
     """
     Parse a string to a :class:`datetime.date`-object.
 
     :arg str string:        String to be parsed.
-    :keyword list formats:  Optional list of formats-string.
+    :keyword list formats:  Optional list of formats-string or
+                            :class:`CompiledFormats`.
     :keyword today:         optional date
     :type today:            datetime.date
+    :keyword str output:    Output-mode (s. :data:`OUTPUTS`).
+    :keyword bool with_format:  Return a tuple (result, format).
 
     :rtype:                 :class:`datetime.date`
     :raises:                ValueError, if string couldn't been parsed
@@ -934,29 +2664,49 @@ def parsedate(string, formats=list(), today=None):
 
     If *string* is parsed with an incomplete format (missing year or year and
     month), the date will be completed by *today* or :attr:`timeparser.TODAY`.
+
+    With *with_format* the format that parsed *string* is returned as well, so
+    that it could be pinned by :class:`CompiledFormats` or used to write values
+    back in the same layout by :func:`format_many`:
+
+        >>> parsedate('24.04.2013', with_format=True)
+        (datetime.date(2013, 4, 24), '%d.%m.%Y')
     """
-    formats = formats or DateFormats(string=string)
+    formats = _listed(formats)
+    if RECORDER.rate: RECORDER.record('date', string, formats=formats,
+        today=today, output=output)
     today = today or TODAY
-    for f in formats:
-        try: date = datetime.datetime.strptime(string, f).date()
-        except ValueError: continue
-        else:
-            if '%y' not in f.lower():
-                date = date.replace(year=today.year)
-            if '%m' not in f and '%b' not in f.lower():
-                date = date.replace(month=today.month)
-            return date
-    raise ValueError("couldn't parse '%s' as date" % string)
+    if not RESULTS.maxsize: result = _parsedate(string, formats, today, output)
+    else:
+        key = ('date', string, tuple(formats), today.year, today.month, output,
+            _config_state(), LEARNED.generation)
+        result = RESULTS(key, _parsedate, string, formats, today, output)
+    return result if with_format else result[0]
 
 
-def parsedatetime(string, formats=list(), today=None):
+@_budgeted
+def _parsedate(string, formats, today, output):
+    if isinstance(formats, CompiledFormats):
+        return formats.parse(string, 'date', today, output, True)
+    formats, learn = _formats(DateFormats, 'date', string, formats)
+    return _parse_fields(string, formats, today, 'date', output, learn)
+
+
+def parsedatetime(string, formats=list(), today=None, output='object',
+                  allow_epoch=None, with_format=False):
     """
     Parse a string to a :class:`datetime.datetime`-object.
 
     :arg str string:        String to be parsed.
-    :keyword list formats:  Optional list of formats-string.
+    :keyword list formats:  Optional list of formats-string or
+                            :class:`CompiledFormats`.
     :keyword today:         Optional date
     :type today:            datetime.datetime
+    :keyword str output:    Output-mode (s. :data:`OUTPUTS`).
+    :keyword bool allow_epoch:  Accept unix-timestamps (defaults to
+                            :attr:`DatetimeFormats.ALLOW_EPOCH`).
+    :keyword bool with_format:  Return a tuple (result, format); the format of
+                            a unix-timestamp is None.
 
     :rtype:                 :class:`datetime.datetime`
     :raises:                ValueError, if string couldn't been parsed
@@ -966,19 +2716,56 @@ def parsedatetime(string, formats=list(), today=None):
 
     If *string* is parsed with an incomplete format (missing year or year and
     month), the date will be completed by *today* or :attr:`timeparser.TODAY`.
+
+    If *allow_epoch* is True, unix-timestamps in seconds (9 or 10 digits,
+    optional with a fraction), milliseconds (12 or 13 digits) or microseconds
+    (15 or 16 digits) within :attr:`DatetimeFormats.EPOCH_RANGE` are converted
+    arithmetically before any format is tried:
+
+        >>> parsedatetime('1366843445', allow_epoch=True)
+        datetime.datetime(2013, 4, 24, 22, 44, 5)
+
+    If :attr:`DatetimeFormats.ALLOW_OFFSET` is set, a trailing utc-offset
+    gives an aware datetime; the output-modes 'fields' and 'epoch' are
+    normalized to UTC:
+
+        >>> DatetimeFormats.config(allow_offset=True)
+        >>> parsedatetime('24.04.2013 23:44+02:00')
+        datetime.datetime(2013, 4, 24, 23, 44, tzinfo=FixedOffset(120))
+        >>> parsedatetime('24.04.2013 23:44+02:00', output='fields')
+        (2013, 4, 24, 21, 44, 0, 0)
     """
-    formats = formats or DatetimeFormats(string=string)
+    formats = _listed(formats)
+    if RECORDER.rate: RECORDER.record('datetime', string, formats=formats,
+        today=today, output=output, allow_epoch=allow_epoch)
     today = today or TODAY
-    for f in formats:
-        try: dtime = datetime.datetime.strptime(string, f)
-        except ValueError: continue
-        else:
-            if '%y' not in f.lower():
-                dtime = dtime.replace(year=today.year)
-            if '%m' not in f and '%b' not in f.lower():
-                dtime = dtime.replace(month=today.month)
-            return dtime
-    raise ValueError("couldn't parse '%s' as datetime" % string)
+    if DatetimeFormats.isnone(allow_epoch): allow_epoch = DatetimeFormats.ALLOW_EPOCH
+    if not RESULTS.maxsize:
+        result = _parsedatetime(string, formats, today, output, allow_epoch)
+    else:
+        key = ('datetime', string, tuple(formats), today.year, today.month,
+            output, allow_epoch, _config_state(), LEARNED.generation)
+        result = RESULTS(key, _parsedatetime, string, formats, today, output,
+            allow_epoch)
+    return result if with_format else result[0]
+
+
+@_budgeted
+def _parsedatetime(string, formats, today, output, allow_epoch):
+    if DatetimeFormats.ALLOW_OFFSET:
+        rest, offset = _split_offset(string)
+        if offset is not None:
+            try: return _apply_offset(_parsedatetime(rest, formats, today,
+                output, allow_epoch), offset, 'datetime', output)
+            except BudgetExceeded: raise
+            except ValueError: pass
+    if allow_epoch and not formats:
+        result = _parse_epoch(string, output)
+        if result is not None: return result, None
+    if isinstance(formats, CompiledFormats):
+        return formats.parse(string, 'datetime', today, output, True)
+    formats, learn = _formats(DatetimeFormats, 'datetime', string, formats)
+    return _parse_fields(string, formats, today, 'datetime', output, learn)
 
 
 def parsetimedelta(string, key='weeks'):
@@ -1008,6 +2795,12 @@ def parsetimedelta(string, key='weeks'):
     >>> parsetimedelta('1h 2m 3s') == datetime.timedelta(hours=1, minutes=2, seconds=3)
     True
     """
+    if RECORDER.rate: RECORDER.record('timedelta', string, key=key)
+    if not RESULTS.maxsize: return _parsetimedelta(string, key)
+    return RESULTS(('timedelta', string, key), _parsetimedelta, string, key)
+
+
+def _parsetimedelta(string, key):
     kws = ('weeks', 'days', 'hours', 'minutes', 'seconds')
     msg = "couldn't parse '%s' as timedelta"
     key_msg = "couldn't find a timedelta-key for '%s'"
@@ -1031,5 +2824,571 @@ def parsetimedelta(string, key='weeks'):
     else: return timedelta
 
 
+def try_parsetime(string, formats=list(), output='object', default=None):
+    """
+    Like :func:`parsetime`, but return *default* if string couldn't been
+    parsed.
+    """
+    try: return parsetime(string, formats, output)
+    except ValueError: return default
+
+
+def try_parsedate(string, formats=list(), today=None, output='object',
+                  default=None):
+    """
+    Like :func:`parsedate`, but return *default* if string couldn't been
+    parsed:
+
+        >>> try_parsedate('31.04.2013') is None
+        True
+    """
+    try: return parsedate(string, formats, today, output)
+    except ValueError: return default
+
+
+def try_parsedatetime(string, formats=list(), today=None, output='object',
+                      allow_epoch=None, default=None):
+    """
+    Like :func:`parsedatetime`, but return *default* if string couldn't been
+    parsed.
+    """
+    try: return parsedatetime(string, formats, today, output, allow_epoch)
+    except ValueError: return default
+
+
+def try_parsetimedelta(string, key='weeks', default=None):
+    """
+    Like :func:`parsetimedelta`, but return *default* if string couldn't been
+    parsed.
+    """
+    try: return parsetimedelta(string, key)
+    except ValueError: return default
+
+
+def is_parseable(string, kind='date', formats=list(), today=None):
+    """
+    Check if string could be parsed as kind without building any object.
+
+    :arg str string:        String to be checked.
+    :keyword str kind:      'time', 'date' or 'datetime'
+    :keyword list formats:  Optional list of formats-string or
+                            :class:`CompiledFormats`.
+    :keyword today:         Optional date to complete incomplete dates.
+
+    :rtype:                 bool
+
+    The answer is the same the `parser-functions`_ would give, but no
+    exception is raised and no :mod:`datetime`-object is created.
+    """
+    try: return _is_parseable(string, kind, formats, today or TODAY)
+    except ValueError: return False
+
+
+@_budgeted
+def _is_parseable(string, kind, formats, today):
+    if kind != 'date' and StreamParser.CLASSES[kind].ALLOW_OFFSET:
+        rest, offset = _split_offset(string)
+        if offset is not None and _is_parseable(rest, kind, formats, today):
+            return True
+    if isinstance(formats, CompiledFormats): matchers = formats._matchers
+    else:
+        if not formats:
+            if (kind == 'datetime' and DatetimeFormats.ALLOW_EPOCH
+                and _parse_epoch(string, 'epoch') is not None): return True
+            cls = StreamParser.CLASSES[kind]
+            tokens = _lex(string)
+            prefilter = _prefilter(cls)
+            if prefilter and prefilter.rejects(string, tokens): return False
+            learned = LEARNED.lookup(kind, string) if LEARNED.path else None
+            if learned: formats = _candidates(cls, string, tokens, learned)
+            else: formats = cls(string=string, tokens=tokens)
+        matchers = (_compile(f) for f in formats)
+    for matcher in _attempts(string, matchers):
+        fields = matcher.match(string)
+        if fields is None: continue
+        if kind == 'time' or matcher.has_year and matcher.has_month: return True
+        year = fields[0] if matcher.has_year else today.year
+        month = fields[1] if matcher.has_month else today.month
+        return fields[2] <= _days_in_month(year, month)
+    return False
+
+
+def validate_many(strings, kind='date', formats=list(), today=None):
+    """
+    Check a sequence of strings with :func:`is_parseable`.
+
+    :arg strings:           Iterable of strings to be checked.
+    :keyword str kind:      'time', 'date' or 'datetime'
+    :keyword list formats:  Optional list of formats-string or
+                            :class:`CompiledFormats`.
+    :keyword today:         Optional date to complete incomplete dates.
+
+    :rtype:                 list of bools
+
+    Formats are compiled once for all strings and repeated strings are only
+    checked once:
+
+        >>> mask = validate_many(['24.04.2013', 'bla', '31.04.2013'])
+        >>> mask
+        [True, False, False]
+        >>> mask.count(False)
+        2
+    """
+    today = today or TODAY
+    if formats and not isinstance(formats, CompiledFormats):
+        formats = CompiledFormats(formats)
+    seen = dict()
+    mask = list()
+    for string in strings:
+        try: valid = seen[string]
+        except KeyError:
+            valid = seen[string] = is_parseable(string, kind, formats, today)
+        mask.append(valid)
+    return mask
+
+
+_RAISE = object()
+_INTERN_MAX = 100000
+
+def parse_many(strings, kind='date', today=None, output='object', default=_RAISE,
+               intern=False):
+    """
+    Parse a sequence of strings of one or several layouts.
+
+    :arg strings:           Iterable of strings to be parsed.
+    :keyword str kind:      'time', 'date' or 'datetime'
+    :keyword today:         Optional date to complete incomplete dates.
+    :keyword str output:    Output-mode (s. :data:`OUTPUTS`).
+    :keyword default:       Result for strings that couldn't been parsed.
+    :keyword bool intern:   Share the results of equal values.
+
+    :rtype:                 list
+    :raises:                ValueError, if a string couldn't been parsed and
+                            no *default* is given
+
+    The strings are grouped by their skeleton (each digit replaced by '9').
+    The formats are built once per group and compiled; all other strings of
+    the group are only matched against them. The results are returned in the
+    order of *strings*:
+
+        >>> parse_many(['24.04.2013', '25 Apr 2013', '26.04.2013', 'bla'],
+        ...     default=None)
+        [datetime.date(2013, 4, 24), datetime.date(2013, 4, 25), datetime.date(2013, 4, 26), None]
+
+    Each string gets the result the `parser-functions`_ would give, though
+    parse_many neither looks up nor fills :data:`RESULTS` and doesn't teach
+    :data:`LEARNED`. Strings exceeding :data:`BUDGET` get *default* like
+    strings that couldn't been parsed.
+
+    Columns with few distinct values (like the dates of a day-partitioned
+    table) hold a fresh object per row. With *intern* equal results are one
+    and the same object and repeated strings (even those that couldn't been
+    parsed) are parsed only once. At most 100000 distinct values and as many
+    strings are kept:
+
+        >>> dates = parse_many(['24.04.2013', '24 Apr 2013'], intern=True)
+        >>> dates[0] is dates[1]
+        True
+    """
+    strings = list(strings)
+    if RECORDER.rate:
+        for string in strings: RECORDER.record(kind, string, 'parse_many',
+            today=None if kind == 'time' else today, output=output)
+    today = today or TODAY
+    cls = StreamParser.CLASSES[kind]
+    if kind == 'time': parse = lambda s, f: _parsetime(s, f, output)
+    elif kind == 'date': parse = lambda s, f: _parsedate(s, f, today, output)
+    else:
+        allow_epoch = DatetimeFormats.ALLOW_EPOCH
+        parse = lambda s, f: _parsedatetime(s, f, today, output, allow_epoch)
+    split = kind != 'date' and cls.ALLOW_OFFSET
+
+    groups = dict()
+    for i, string in enumerate(strings):
+        offset = _split_offset(string)[1] if split else None
+        key = (_SHAPE_DIGIT.sub('9', string), offset is None)
+        try: groups[key].append(i)
+        except KeyError: groups[key] = [i]
+
+    results = [default] * len(strings)
+    seen, values = dict(), dict()
+    for (shape, plain), rows in groups.items():
+        string = strings[rows[0]]
+        rest = string if plain else _split_offset(string)[0]
+        formats = list()
+        if not (kind == 'datetime' and allow_epoch and _EPOCH.match(rest)):
+            try: formats = CompiledFormats(_formats(cls, kind, rest, [])[0])
+            except BudgetExceeded:
+                # the other strings of the group would exceed it as well
+                if default is _RAISE: raise
+                continue
+            except ValueError: pass
+        for i in rows:
+            string = strings[i]
+            if intern and string in seen:
+                results[i] = seen[string]
+                continue
+            try: value = parse(string, formats)[0]
+            except BudgetExceeded:
+                if default is _RAISE: raise
+                continue
+            except ValueError:
+                if default is _RAISE: raise
+                value = default
+            else:
+                if intern and len(values) < _INTERN_MAX:
+                    # aware objects of different offsets could be equal
+                    value = values.setdefault((value, getattr(value, 'tzinfo', None)), value)
+            if intern and len(seen) < _INTERN_MAX: seen[string] = value
+            results[i] = value
+    return results
+
+
+_RENDER = dict(
+    d = ('%02d', 'day', None),
+    m = ('%02d', 'month', None),
+    y = ('%02d', 'year', lambda v: v % 100),
+    Y = ('%04d', 'year', None),
+    H = ('%02d', 'hour', None),
+    M = ('%02d', 'minute', None),
+    S = ('%02d', 'second', None),
+    f = ('%06d', 'microsecond', None),
+    )
+"""Template, attribute and conversion of the codes :class:`_Formatter` knows."""
+
+_RENDER_NAMES = dict(b=1, B=0)
+"""Index of the month-names in :data:`MONTH_NAMES` for the codes '%b' and '%B'."""
+
+
+class _Formatter(object):
+    """
+    A format-string compiled to a %-template and a getter for the attributes
+    to fill it with. Month-names are rendered in the language lang of
+    :data:`MONTH_NAMES`. Formats with other directives are left to strftime,
+    which knows english month-names only.
+    """
+    __slots__ = ('format', 'render')
+
+    def __init__(self, fmt, lang='en'):
+        self.format = fmt
+        self.render = self._strftime
+        template, attrs, convs = list(), list(), list()
+        for i, part in enumerate(re.split('(%.)', fmt)):
+            if not i % 2: template.append(part.replace('%', '%%'))
+            elif part == '%%': template.append(part)
+            elif part[1] in _RENDER:
+                spec, attr, conv = _RENDER[part[1]]
+                template.append(spec)
+                attrs.append(attr)
+                convs.append(conv)
+            elif part[1] in _RENDER_NAMES:
+                index = _RENDER_NAMES[part[1]]
+                names = [n[index].split('|')[0].title() for n in MONTH_NAMES[lang]]
+                template.append('%s')
+                attrs.append('month')
+                convs.append(lambda v, names=names: names[v - 1])
+            elif lang != 'en' and set(('%b', '%B')) & set(re.split('(%.)', fmt)[1::2]):
+                raise ValueError("month-names of '%s' can't be rendered in '%s'"
+                    % (fmt, lang))
+            else: return
+        template = ''.join(template)
+        if len(attrs) == 1: getter = lambda v: (getattr(v, attrs[0]),)
+        else: getter = operator.attrgetter(*attrs)
+        if not any(convs): self.render = lambda v: template % getter(v)
+        else:
+            convs = [c or (lambda x: x) for c in convs]
+            self.render = lambda v: template % tuple(
+                c(x) for c, x in zip(convs, getter(v)))
+
+    def _strftime(self, value):
+        return value.strftime(self.format)
 
+    def __call__(self, value):
+        try: return self.render(value)
+        except AttributeError: return value.strftime(self.format)
 
+
+_FORMATTERS = dict()
+
+def _formatter(fmt, lang='en'):
+    """
+    Return the cached :class:`_Formatter` for fmt and lang.
+    """
+    try: return _FORMATTERS[(fmt, lang)]
+    except KeyError: pass
+    if lang not in MONTH_NAMES:
+        raise ValueError("'%s' is not a language of MONTH_NAMES" % lang)
+    if len(_FORMATTERS) >= _MATCHERS_MAX: _FORMATTERS.clear()
+    formatter = _FORMATTERS[(fmt, lang)] = _Formatter(fmt, lang)
+    return formatter
+
+
+def format_many(values, fmt, lang='en'):
+    """
+    Render date-, time- or datetime-objects with a format-string.
+
+    :arg values:        Iterable of :mod:`datetime`-objects.
+    :arg str fmt:       Format-string, e.g. one returned by the
+                        `parser-functions`_ with *with_format*.
+    :keyword str lang:  Language of :data:`MONTH_NAMES` month-names are
+                        rendered in.
+
+    :rtype:             list of str
+    :raises:            ValueError, if lang is unknown or fmt has month-names
+                        and needs strftime while lang isn't 'en'.
+
+    The format is compiled once and cached. Unlike strftime, years before
+    1900 are rendered as well. Month-names are rendered by their first
+    spelling in :data:`MONTH_NAMES`; pass the language of the parsed strings
+    to write them back in the same language. Formats with directives the
+    format-classes don't use are rendered by strftime:
+
+        >>> date, fmt = parsedate('24.04.2013', with_format=True)
+        >>> fmt
+        '%d.%m.%Y'
+        >>> format_many([date, datetime.date(1848, 3, 18)], fmt)
+        ['24.04.2013', '18.03.1848']
+    """
+    formatter = _formatter(fmt, lang)
+    if not isinstance(values, list): values = list(values)
+    try: return map(formatter.render, values)
+    except AttributeError: return map(formatter, values)
+
+
+class StreamParser(object):
+    """
+    Parse a stream of similar strings, like the timestamps of a log-file.
+
+    :keyword str kind:      'time', 'date' or 'datetime'
+    :keyword today:         Optional date to complete incomplete dates.
+    :keyword str output:    Output-mode (s. :data:`OUTPUTS`).
+
+    The first string is parsed as usual. The following strings are compared
+    field by field with their predecessor: If they have the same layout only
+    the changed fields are decoded (mostly the last two or three digits).
+    Otherwise the string is parsed as usual and its layout is kept for the
+    following strings:
+
+        >>> parser = StreamParser('datetime')
+        >>> parser('24.04.2013 23:44:05')
+        datetime.datetime(2013, 4, 24, 23, 44, 5)
+        >>> parser('24.04.2013 23:44:06')
+        datetime.datetime(2013, 4, 24, 23, 44, 6)
+        >>> parser.hits, parser.misses
+        (1, 1)
+
+    Mind that the layout of the previous string wins as long as it fits,
+    even if another format would have been tried first for a single string.
+    Trailing utc-offsets are honoured like by the `parser-functions`_ (s.
+    :attr:`DatetimeFormats.ALLOW_OFFSET`).
+    """
+    CLASSES = dict(time=TimeFormats, date=DateFormats, datetime=DatetimeFormats)
+    WIDTHS = _WIDTHS
+    RANGES = dict(d=(1, 31), m=(1, 12), H=(0, 23), M=(0, 59), S=(0, 59))
+
+    def __init__(self, kind='datetime', today=None, output='object'):
+        self._cls = self.CLASSES[kind]
+        self._kind = kind
+        self._today = today
+        self._output = output
+        self._string = None
+        self._matcher = None
+        self._values = self._spans = self._fixed = None
+        self.hits = self.misses = 0
+
+    def __call__(self, string):
+        return self.parse(string)
+
+    def parse(self, string):
+        """
+        Parse string and return the result in the output-mode.
+        """
+        if RECORDER.rate: RECORDER.record(self._kind, string, 'StreamParser',
+            today=None if self._kind == 'time' else self._today, output=self._output)
+        if self._kind != 'date' and self._cls.ALLOW_OFFSET:
+            rest, offset = _split_offset(string)
+            if offset is not None:
+                try: return _apply_offset((self._value(rest), None), offset,
+                    self._kind, self._output)[0]
+                except BudgetExceeded: raise
+                except ValueError: pass
+        return self._value(string)
+
+    def _value(self, string):
+        fields = None
+        if self._string is not None and len(string) == len(self._string):
+            fields = self._update(string)
+        if fields is None:
+            fields = self._parse(string)
+            self.misses += 1
+        else: self.hits += 1
+        if self._kind != 'time':
+            fields = self._matcher.complete(fields, self._today or TODAY)
+        if self._output == 'object': return _to_object(fields, self._kind)
+        return _output(fields, self._kind, self._output)
+
+    def _parse(self, string):
+        for f in _attempts(string, self._cls(string)):
+            matcher = _matcher(f)
+            found = matcher.search(string)
+            if found is None: continue
+            codes = matcher._codes
+            values = [_convert(c, v) for c, v in zip(codes, found.groups())]
+            fields = matcher.fields(values)
+            if fields is None: continue
+            self._matcher = matcher
+            self._string = string
+            self._values = values
+            self._spans = [found.span(i + 1) for i in range(len(codes))]
+            self._fixed = [self._is_fixed(string, c, a, b)
+                for c, (a, b) in zip(codes, self._spans)]
+            return fields
+        self._string = None
+        raise ValueError("couldn't parse '%s' as %s" % (string, self._kind))
+
+    def _is_fixed(self, string, code, start, end):
+        """
+        A field could be decoded in place, if it is numeric and has its full
+        width or is enclosed by non-digits.
+        """
+        if code not in self.WIDTHS: return False
+        if end - start == self.WIDTHS[code]: return True
+        return ((start == 0 or not string[start-1].isdigit()) and
+                (end == len(string) or not string[end].isdigit()))
+
+    def _update(self, string):
+        prev = self._string
+        if string == prev: return self._matcher.fields(self._values)
+        values = self._values[:]
+        pos = 0
+        for i, (start, end) in enumerate(self._spans):
+            if string[pos:start] != prev[pos:start]: return None
+            pos = end
+            value = string[start:end]
+            if value == prev[start:end]: continue
+            code = self._matcher._codes[i]
+            if not self._fixed[i] or not value.isdigit(): return None
+            values[i] = _convert(code, value)
+            if code in self.RANGES:
+                low, high = self.RANGES[code]
+                if not low <= values[i] <= high: return None
+        if string[pos:] != prev[pos:]: return None
+        fields = self._matcher.fields(values)
+        if fields is not None:
+            self._string = string
+            self._values = values
+        return fields
+
+
+_COLUMN_DTYPES = dict(time='timedelta64[us]', date='datetime64[D]',
+    datetime='datetime64[us]')
+
+def _fixed_layout(string, kind):
+    """
+    Return the matcher and the spans of the fields for the first format of
+    kind that parses string. All fields have to be numeric and of full width.
+    """
+    for f in StreamParser.CLASSES[kind](string):
+        matcher = _matcher(f)
+        found = matcher.search(string)
+        if found is None: continue
+        codes = matcher._codes
+        values = [_convert(c, v) for c, v in zip(codes, found.groups())]
+        if matcher.fields(values) is None: continue
+        spans = [found.span(i + 1) for i in range(len(codes))]
+        widths = StreamParser.WIDTHS
+        for code, (start, end) in zip(codes, spans):
+            if code not in widths or code != 'f' and end - start != widths[code]:
+                raise ValueError("'%s' isn't of fixed width (%s)" % (string, f))
+        return matcher, spans
+    raise ValueError("couldn't parse '%s' as %s" % (string, kind))
+
+
+def decode_column(column, kind='datetime', today=None, nat=False):
+    """
+    Decode a column of fixed-width strings at once using :mod:`numpy`.
+
+    :arg column:            Sequence or numpy-array of strings of the same
+                            width and layout.
+    :keyword str kind:      'time', 'date' or 'datetime'
+    :keyword today:         Optional date to complete incomplete dates.
+    :keyword bool nat:      Set rows that couldn't be decoded to NaT instead of
+                            raising a ValueError.
+
+    :rtype:                 :class:`numpy.ndarray` of datetime64[D] for dates,
+                            datetime64[us] for datetimes and timedelta64[us]
+                            (since midnight) for times.
+    :raises:                ValueError, if a row couldn't be decoded, the
+                            format of the first row isn't of fixed width or
+                            it has an utc-offset; ImportError, if numpy isn't
+                            installed.
+
+    The format is looked up by the format-class of *kind* for the first row.
+    All its fields must be numeric and of full width (like '%d.%m.%Y %H:%M' or
+    '%Y%m%d%H%M%S'). The column is then viewed as a two-dimensional array of
+    bytes and all rows are decoded and range-checked by vector-arithmetic:
+
+        >>> decode_column(['20130424234405', '20130425000000'])
+        array(['2013-04-24T23:44:05.000000', '2013-04-25T00:00:00.000000'],
+              dtype='datetime64[us]')
+    """
+    if numpy is None: raise ImportError('decode_column needs numpy')
+    column = numpy.asarray(column)
+    # numpy makes a float-array of an empty list
+    if not column.size: return numpy.empty(0, _COLUMN_DTYPES[kind])
+    if column.dtype.kind == 'U':
+        try: column = column.astype('S')
+        except UnicodeEncodeError:
+            raise ValueError('column must be a sequence of ascii-strings')
+    if column.dtype.kind != 'S' or column.ndim != 1:
+        raise ValueError('column must be a one-dimensional sequence of strings')
+    #views of slices with a step aren't contiguous and can't be viewed as bytes
+    column = numpy.ascontiguousarray(column)
+    rows, width = len(column), column.dtype.itemsize
+    if RECORDER.rate:
+        for string in column: RECORDER.record(kind, str(string), 'decode_column',
+            today=None if kind == 'time' else today)
+    today = today or TODAY
+    first = str(column[0])
+    if kind != 'date' and StreamParser.CLASSES[kind].ALLOW_OFFSET:
+        if _split_offset(first)[1] is not None:
+            raise ValueError("'%s' has an utc-offset, numpy knows no timezones" % first)
+    matcher, spans = _fixed_layout(first, kind)
+
+    raw = column.view(numpy.uint8).reshape(rows, width)
+    bad = numpy.zeros(rows, bool)
+    literal = numpy.ones(width, bool)
+    fields = list()
+    for i, default in enumerate((today.year, today.month, 1, 0, 0, 0, 0)):
+        fields.append(numpy.full(rows, default, numpy.int64))
+    for code, (start, end) in zip(matcher._codes, spans):
+        literal[start:end] = False
+        digits = raw[:, start:end].astype(numpy.int64) - ord('0')
+        bad |= ((digits < 0) | (digits > 9)).any(axis=1)
+        value = digits.dot(10 ** numpy.arange(end - start - 1, -1, -1))
+        if code == 'y': value += numpy.where(value <= 68, 2000, 1900)
+        elif code == 'f': value *= 10 ** (6 - (end - start))
+        fields[_FIELDS[code]] = value
+    bad |= (raw[:, literal] != raw[0, literal]).any(axis=1)
+
+    year, month, day, hour, minute, second, micro = fields
+    bad |= (hour > 23) | (minute > 59) | (second > 59)
+    clock = ((hour * 60 + minute) * 60 + second) * 1000000 + micro
+    if kind == 'time':
+        result = clock.astype('timedelta64[us]')
+    else:
+        days = numpy.array((0,) + _DAYS_IN_MONTH)[numpy.clip(month, 0, 12)]
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        days += (month == 2) & leap
+        bad |= (year < 1) | (month < 1) | (month > 12) | (day < 1) | (day > days)
+        result = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+        result = result.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+        if kind == 'datetime':
+            result = result.astype('datetime64[us]') + clock.astype('timedelta64[us]')
+
+    if bad.any():
+        if not nat:
+            string = column[bad.argmax()]
+            raise ValueError("couldn't parse '%s' as %s" % (string, kind))
+        result[bad] = numpy.array('NaT', result.dtype)
+    return result
@@ -0,0 +1,252 @@
+"""
+Replay a corpus recorded by :data:`timeparser.RECORDER`.
+
+Every call of the corpus is run again with its recorded configuration,
+:data:`timeparser.ENDIAN` and :data:`timeparser.TODAY`. The replay reports the
+throughput and the distribution of latencies:
+
+    python -m timeparser_replay corpus.jsonl
+
+Two engines are compared by their results and timings with *--compare*. The
+engine 'parse' calls the `parser-functions`_ string by string, the engine
+'many' passes runs of similar calls to :func:`timeparser.parse_many`:
+
+    python -m timeparser_replay corpus.jsonl --compare many
+
+Another version of timeparser is compared with *--against*, which replays the
+corpus in a subprocess with the timeparser-module of the given directory:
+
+    python -m timeparser_replay corpus.jsonl --against ../timeparser-0.7.3
+"""
+
+import os
+import sys
+import json
+import datetime
+import argparse
+import subprocess
+import timeit
+import timeparser
+
+
+def load(path):
+    """
+    Read a corpus-file.
+
+    :arg str path:      Path of the corpus-file.
+
+    :rtype:             list of tuples (config, call)
+    """
+    corpus = list()
+    config = None
+    with open(path) as f:
+        for line in f:
+            data = json.loads(line)
+            if 'config' in data: config = data['config']
+            else: corpus.append((config, data))
+    return corpus
+
+
+def apply_config(config):
+    """
+    Set the configuration, ENDIAN, TODAY and BUDGET of a corpus. The languages
+    of MONTH_NAMES and whether LEARNED was open are recorded for information
+    only.
+    """
+    for name, attrs in config.items():
+        if name == 'ENDIAN': timeparser.ENDIAN.set(attrs)
+        elif name == 'TODAY': timeparser.TODAY.set(*_date(attrs).timetuple()[:3])
+        elif name == 'BUDGET':
+            if hasattr(timeparser, 'BUDGET'): timeparser.BUDGET.set(**attrs)
+        elif name in ('MONTH_NAMES', 'LEARNED'): continue
+        else:
+            cls = getattr(timeparser, name)
+            for attr, value in attrs.items(): setattr(cls, attr, value)
+
+
+def _date(string):
+    return datetime.datetime.strptime(string, '%Y-%m-%d').date()
+
+
+def _str(string):
+    # the parsers of python2 expect byte-strings
+    try: return str(string)
+    except UnicodeEncodeError: return string
+
+
+def _call(call):
+    """
+    Run a recorded call and return its result as str. Only the arguments that
+    were recorded are passed, so older versions of timeparser without them
+    are called as well; a TypeError is returned as result of the call.
+    """
+    kind = call['kind']
+    string = _str(call['string'])
+    kwargs = dict()
+    if 'key' in call: kwargs['key'] = _str(call['key'])
+    if 'output' in call: kwargs['output'] = _str(call['output'])
+    if 'formats' in call: kwargs['formats'] = map(_str, call['formats'])
+    if 'today' in call: kwargs['today'] = _date(call['today'])
+    if 'allow_epoch' in call: kwargs['allow_epoch'] = call['allow_epoch']
+    try: result = getattr(timeparser, 'parse' + kind)(string, **kwargs)
+    except ValueError as error: return error.__class__.__name__
+    except TypeError as error: return 'TypeError: %s' % error
+    return repr(result)
+
+
+def _run_parse(corpus):
+    results, latencies = list(), list()
+    config = None
+    for call_config, call in corpus:
+        if call_config is not config:
+            apply_config(call_config)
+            config = call_config
+        start = timeit.default_timer()
+        results.append(_call(call))
+        latencies.append(timeit.default_timer() - start)
+    return results, latencies
+
+
+def _batches(corpus):
+    """
+    Split corpus into runs of calls parse_many could do at once.
+    """
+    batch, key = list(), None
+    for config, call in corpus:
+        if call['kind'] == 'timedelta' or 'formats' in call or 'allow_epoch' in call:
+            this = None
+        else: this = (id(config), call['kind'], call.get('today'), call.get('output'))
+        if batch and (this is None or this != key):
+            yield key, batch
+            batch = list()
+        batch.append((config, call))
+        key = this
+    if batch: yield key, batch
+
+
+def _run_many(corpus):
+    results, latencies = list(), list()
+    config = None
+    failed = ValueError()
+    for key, batch in _batches(corpus):
+        if batch[0][0] is not config:
+            apply_config(batch[0][0])
+            config = batch[0][0]
+        if key is None:
+            batch_results, batch_latencies = _run_parse(batch)
+            results.extend(batch_results)
+            latencies.extend(batch_latencies)
+            continue
+        call = batch[0][1]
+        today = _date(call['today']) if call.get('today') else None
+        strings = [_str(c['string']) for x, c in batch]
+        start = timeit.default_timer()
+        values = timeparser.parse_many(strings, call['kind'], today,
+            call.get('output', 'object'), default=failed)
+        latency = (timeit.default_timer() - start) / len(batch)
+        results.extend('ValueError' if v is failed else repr(v) for v in values)
+        latencies.extend([latency] * len(batch))
+    return results, latencies
+
+
+ENGINES = dict(
+    parse = _run_parse,
+    many = _run_many,
+    )
+"""Engines a corpus could be replayed with."""
+
+
+def replay(corpus, engine='parse'):
+    """
+    Replay corpus with an engine.
+
+    :arg list corpus:       Corpus as returned by :func:`load`.
+    :keyword str engine:    Name of an engine of :data:`ENGINES`.
+
+    :rtype:                 dict with the results as str and the latencies in
+                            seconds of all calls
+    """
+    results, latencies = ENGINES[engine](corpus)
+    return dict(engine=engine, version=timeparser.__version__,
+        results=results, latencies=latencies)
+
+
+def _against(path, directory, engine):
+    """
+    Replay the corpus in a subprocess with the timeparser of directory.
+    """
+    env = dict(os.environ)
+    here = os.path.dirname(os.path.abspath(__file__))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [here, env.get('PYTHONPATH')]))
+    output = subprocess.check_output([sys.executable, '-m', 'timeparser_replay',
+        os.path.abspath(path), '--engine', engine, '--json'], cwd=directory, env=env)
+    return json.loads(output)
+
+
+def summary(run):
+    """
+    Return the throughput and the percentiles of the latencies of a replay.
+    """
+    latencies = sorted(run['latencies'])
+    total = sum(latencies)
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+    return dict(calls=len(latencies), seconds=total,
+        throughput=len(latencies) / total if total else 0.0,
+        p50=p(0.5), p90=p(0.9), p99=p(0.99), max=latencies[-1])
+
+
+def differences(corpus, a, b):
+    """
+    Return the calls of corpus with different results in the replays a and b
+    as tuples (call, result of a, result of b).
+    """
+    return [(call, x, y) for (config, call), x, y
+        in zip(corpus, a['results'], b['results']) if x != y]
+
+
+def _report(name, run):
+    s = summary(run)
+    print('%s: %d calls in %.3fs, %.0f calls/s, p50 %.1fus p90 %.1fus '
+        'p99 %.1fus max %.1fus' % (name, s['calls'], s['seconds'],
+        s['throughput'], s['p50'] * 1e6, s['p90'] * 1e6, s['p99'] * 1e6,
+        s['max'] * 1e6))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('corpus', help='path of the corpus-file')
+    parser.add_argument('--engine', default='parse', choices=sorted(ENGINES))
+    parser.add_argument('--compare', choices=sorted(ENGINES),
+                        help='engine to compare with')
+    parser.add_argument('--against', metavar='DIRECTORY',
+                        help='directory of the timeparser to compare with')
+    parser.add_argument('--diffs', type=int, default=10,
+                        help='number of differences to show')
+    parser.add_argument('--json', action='store_true',
+                        help='write the replay as json (used by --against)')
+    args = parser.parse_args(args)
+
+    corpus = load(args.corpus)
+    run = replay(corpus, args.engine)
+    if args.json:
+        json.dump(run, sys.stdout)
+        return
+    name = '%s %s' % (run['version'], args.engine)
+    _report(name, run)
+    others = list()
+    if args.compare:
+        other = replay(corpus, args.compare)
+        others.append(('%s %s' % (other['version'], args.compare), other))
+    if args.against:
+        other = _against(args.corpus, args.against, args.engine)
+        others.append(('%s %s' % (args.against, args.engine), other))
+    for other_name, other in others:
+        _report(other_name, other)
+        diffs = differences(corpus, run, other)
+        print('%d of %d results differ' % (len(diffs), len(corpus)))
+        for call, x, y in diffs[:args.diffs]:
+            print('  %r: %s != %s' % (call['string'], x, y))
+
+
+if __name__ == '__main__':
+    main()
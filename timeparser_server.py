@@ -0,0 +1,356 @@
+"""
+A local server, that parses batches of strings with :mod:`timeparser`.
+
+Programs that can't import :mod:`timeparser` use it as a sidecar and share
+its warm caches. Start it on a unix- or tcp-socket:
+
+    python -m timeparser_server --unix /tmp/timeparser.sock
+    python -m timeparser_server --tcp 127.0.0.1:8642 --kind date --output epoch
+
+A batch is a sequence of strings. With the framing 'line' (default) each string
+is sent on its own line and the batch is closed by an empty line. Therefore an
+empty string is sent as a single backslash and a backslash is prepended to
+strings starting with one. With the framing 'length' a batch is a 4-byte
+big-endian length followed by the strings joined by newlines. The answer is
+framed the same way and has one line per string: the iso-format of the
+result, the microseconds of the output-mode 'epoch' or an empty line if the
+string couldn't been parsed.
+
+Small batches of concurrent connections are coalesced into one call of
+:func:`timeparser.parse_many` (s. :class:`Coalescer`). From python the
+server is used by :class:`Client`:
+
+    >>> server = serve(('127.0.0.1', 0))
+    >>> client = Client(server.server_address)
+    >>> client.parse(['24.04.2013 23:44', 'bla'])
+    ['2013-04-24T23:44:00', '']
+"""
+
+import os
+import time
+import socket
+import struct
+import threading
+import argparse
+import multiprocessing
+import Queue
+import SocketServer
+import timeparser
+
+
+FRAMINGS = ('line', 'length')
+"""Framings of batches the server knows."""
+
+_LENGTH = struct.Struct('>I')
+
+_TRY_PARSERS = dict(
+    time = timeparser.try_parsetime,
+    date = timeparser.try_parsedate,
+    datetime = timeparser.try_parsedatetime,
+    )
+
+
+def _escape(string):
+    return '\\' + string if not string or string.startswith('\\') else string
+
+
+def _unescape(line):
+    return line[1:] if line.startswith('\\') else line
+
+
+def _close_recorder():
+    # workers mustn't write to the corpus-file they inherited
+    timeparser.RECORDER.close()
+
+
+def parse_batch(strings, kind='datetime', output='iso'):
+    """
+    Parse strings and return the answer-lines of the server.
+
+    :arg list strings:      Strings to be parsed.
+    :keyword str kind:      'time', 'date' or 'datetime'
+    :keyword str output:    'iso' or 'epoch'
+
+    :rtype:                 list of str
+    """
+    mode = 'epoch' if output == 'epoch' else 'object'
+    try: results = timeparser.parse_many(strings, kind, output=mode, default=None)
+    except ValueError:
+        results = [_TRY_PARSERS[kind](s, output=mode) for s in strings]
+    if mode == 'epoch': return ['' if r is None else str(r) for r in results]
+    return ['' if r is None else r.isoformat() for r in results]
+
+
+def _parse_or_fail(strings, kind, output):
+    # exceptions of the workers are returned, since apply_async of python2
+    # knows no error-callback
+    try: return parse_batch(strings, kind, output)
+    except Exception as error: return error
+
+
+class Coalescer(object):
+    """
+    Collect concurrent batches and parse them together.
+
+    :keyword str kind:      'time', 'date' or 'datetime'
+    :keyword str output:    'iso' or 'epoch'
+    :keyword float window:  Seconds to wait for more batches.
+    :keyword int max_batch: Strings that are parsed at once at most.
+    :keyword int workers:   Number of worker-processes; with 0 batches are
+                            parsed by the thread of the coalescer.
+
+    Calling the coalescer with a list of strings blocks until the answer is
+    ready. The first batch waits *window* seconds for others to come, which
+    are then parsed by one call of :func:`parse_batch`. The tables and
+    matchers are built by :func:`timeparser.warmup` before the workers are
+    forked, so they share them instead of building their own; the caches of
+    the workers stay warm as long as the coalescer lives. The strings are sampled
+    by :data:`timeparser.RECORDER` in the thread of the coalescer.
+    """
+    def __init__(self, kind='datetime', output='iso', window=0.002,
+                 max_batch=10000, workers=0):
+        self.kind = kind
+        self.output = output
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._queue = Queue.Queue()
+        if workers: timeparser.warmup()
+        self._pool = multiprocessing.Pool(workers, _close_recorder) if workers else None
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __call__(self, strings):
+        job = [strings, threading.Event(), None]
+        self._queue.put(job)
+        job[1].wait()
+        if isinstance(job[2], Exception): raise job[2]
+        return job[2]
+
+    def close(self):
+        """
+        Stop the coalescer and its workers.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._pool:
+            self._pool.close()
+            self._pool.join()
+
+    def _collect(self, job):
+        jobs = [job]
+        size = len(job[0])
+        deadline = time.time() + self.window
+        while size < self.max_batch:
+            timeout = deadline - time.time()
+            if timeout <= 0: break
+            try: job = self._queue.get(timeout=timeout)
+            except Queue.Empty: break
+            if job is None:
+                self._queue.put(None)
+                break
+            jobs.append(job)
+            size += len(job[0])
+        return jobs
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None: break
+            jobs = self._collect(job)
+            with self._lock:
+                self.batches += 1
+                self.requests += len(jobs)
+            strings = [s for job in jobs for s in job[0]]
+            args = (strings, self.kind, self.output)
+            recorder = timeparser.RECORDER
+            if recorder.rate:
+                output = 'epoch' if self.output == 'epoch' else None
+                for string in strings:
+                    recorder.record(self.kind, string, 'server', output=output)
+            if not self._pool:
+                recorder.pause()
+                try: self._deliver(jobs, _parse_or_fail(*args))
+                finally: recorder.resume()
+            else:
+                callback = lambda lines, jobs=jobs: self._deliver(jobs, lines)
+                try: self._pool.apply_async(_parse_or_fail, args, callback=callback)
+                except Exception as error: self._deliver(jobs, error)
+
+    def _deliver(self, jobs, lines):
+        start = 0
+        for job in jobs:
+            if isinstance(lines, Exception): job[2] = lines
+            else: job[2] = lines[start:start + len(job[0])]
+            start += len(job[0])
+            job[1].set()
+
+
+def _read_batch(rfile, framing):
+    """
+    Read a batch from rfile; return None at the end of the stream (an
+    incomplete batch is dropped).
+    """
+    if framing == 'length':
+        header = rfile.read(_LENGTH.size)
+        if len(header) < _LENGTH.size: return None
+        size = _LENGTH.unpack(header)[0]
+        payload = rfile.read(size)
+        if len(payload) < size: return None
+        return payload.decode('utf-8').split('\n') if payload else list()
+    strings = list()
+    for line in iter(rfile.readline, ''):
+        if not line.endswith('\n'): return None
+        line = line.rstrip('\r\n')
+        if not line: return strings
+        strings.append(_unescape(line).decode('utf-8'))
+    return None
+
+
+def _write_batch(wfile, framing, lines):
+    payload = '\n'.join(lines)
+    if framing == 'length': wfile.write(_LENGTH.pack(len(payload)) + payload)
+    else: wfile.write(payload + '\n' if lines else '')
+    wfile.flush()
+
+
+class _Handler(SocketServer.StreamRequestHandler):
+    def handle(self):
+        while True:
+            strings = _read_batch(self.rfile, self.server.framing)
+            if strings is None: break
+            lines = self.server.coalescer(strings) if strings else list()
+            _write_batch(self.wfile, self.server.framing, lines)
+
+
+class _BatchServer(SocketServer.ThreadingMixIn):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def server_close(self):
+        SocketServer.TCPServer.server_close(self)
+        self.coalescer.close()
+
+
+class TCPServer(_BatchServer, SocketServer.TCPServer):
+    """A threading tcp-server for batches; s. :func:`serve`."""
+
+
+class UnixServer(_BatchServer, SocketServer.UnixStreamServer):
+    """A threading unix-socket-server for batches; s. :func:`serve`."""
+
+    def server_close(self):
+        _BatchServer.server_close(self)
+        if os.path.exists(self.server_address): os.remove(self.server_address)
+
+
+def serve(address, kind='datetime', output='iso', framing='line',
+          window=0.002, max_batch=10000, workers=0, background=True):
+    """
+    Start a server on address.
+
+    :arg address:           Path of a unix-socket or tuple (host, port).
+    :keyword str kind:      'time', 'date' or 'datetime'
+    :keyword str output:    'iso' or 'epoch'
+    :keyword str framing:   'line' or 'length' (s. :data:`FRAMINGS`)
+    :keyword float window:  s. :class:`Coalescer`
+    :keyword int max_batch: s. :class:`Coalescer`
+    :keyword int workers:   s. :class:`Coalescer`
+    :keyword bool background:   Serve from a daemon-thread and return at once.
+
+    :rtype:                 :class:`TCPServer` or :class:`UnixServer`
+
+    Stop the server by its methods shutdown and server_close.
+    """
+    if framing not in FRAMINGS:
+        raise ValueError("'%s' is an invalid framing" % framing)
+    cls = UnixServer if isinstance(address, basestring) else TCPServer
+    server = cls(address, _Handler)
+    server.framing = framing
+    server.coalescer = Coalescer(kind, output, window, max_batch, workers)
+    if not background: server.serve_forever()
+    else:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+    return server
+
+
+class Client(object):
+    """
+    A connection to a server.
+
+    :arg address:           Path of a unix-socket or tuple (host, port).
+    :keyword str framing:   The framing of the server.
+
+    Mind that strings must not contain newlines and that with the framing
+    'length' a batch of a single empty string can't be told from an empty one.
+    """
+    def __init__(self, address, framing='line'):
+        family = socket.AF_UNIX if isinstance(address, basestring) else socket.AF_INET
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.connect(address)
+        self._rfile = self._socket.makefile('rb')
+        self._wfile = self._socket.makefile('wb')
+        self.framing = framing
+
+    def parse(self, strings):
+        """
+        Send strings as one batch and return the answer-lines.
+
+        :raises:            IOError, if the server closed the connection.
+        """
+        strings = [s.encode('utf-8') if isinstance(s, unicode) else s for s in strings]
+        if self.framing == 'length': _write_batch(self._wfile, 'length', strings)
+        else: _write_batch(self._wfile, 'line', map(_escape, strings) + [''])
+        if self.framing == 'length':
+            header = self._rfile.read(_LENGTH.size)
+            if len(header) < _LENGTH.size: raise IOError('connection closed by the server')
+            payload = self._rfile.read(_LENGTH.unpack(header)[0])
+            return payload.split('\n') if strings else list()
+        lines = list()
+        for s in strings:
+            line = self._rfile.readline()
+            if not line.endswith('\n'): raise IOError('connection closed by the server')
+            lines.append(line.rstrip('\n'))
+        return lines
+
+    def close(self):
+        self._rfile.close()
+        self._wfile.close()
+        self._socket.close()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument('--unix', help='path of the unix-socket')
+    address.add_argument('--tcp', help='host:port to listen on')
+    parser.add_argument('--kind', default='datetime', choices=('time', 'date', 'datetime'))
+    parser.add_argument('--output', default='iso', choices=('iso', 'epoch'))
+    parser.add_argument('--framing', default='line', choices=FRAMINGS)
+    parser.add_argument('--endian', help='endian of timeparser.ENDIAN')
+    parser.add_argument('--window', type=float, default=0.002,
+                        help='seconds to wait for batches to coalesce')
+    parser.add_argument('--max-batch', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='number of worker-processes')
+    parser.add_argument('--results', type=int, default=0,
+                        help='maxsize of timeparser.RESULTS')
+    args = parser.parse_args(args)
+
+    if args.endian: timeparser.ENDIAN.set(args.endian)
+    if args.results: timeparser.RESULTS.set(args.results)
+    if args.unix: address = args.unix
+    else:
+        host, port = args.tcp.rsplit(':', 1)
+        address = (host, int(port))
+    serve(address, args.kind, args.output, args.framing, args.window,
+                   args.max_batch, args.workers, background=False)
+
+
+if __name__ == '__main__':
+    main()